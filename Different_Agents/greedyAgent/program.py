@@ -5,8 +5,6 @@ from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
 from library.heuristics import *
 import numpy as np
-import random
-from copy import deepcopy
 
 DIRECTIONS = (HexDir.DownRight, HexDir.Down, HexDir.DownLeft, HexDir.UpLeft, HexDir.Up, HexDir.UpRight)
 
@@ -33,13 +31,9 @@ class Agent:
         """
         Return the next action to take.
         """
-        move_values = []
-        
-        for move in self.get_possible_moves():
-            new_board = self.apply_action(self._board, move, self._color)
-            move_values.append((move, power_difference_heuristic(new_board, self._color)))
-        random.shuffle(move_values)
-        return max(move_values, key = lambda x: x[1])[0]
+        # Scores come straight from the spread destinations, so no board is
+        # copied or re-summed per move
+        return score_moves(self._board, self._color, 1)[0].action
 
 
     def turn(self, color: PlayerColor, action: Action, **referee: dict):
@@ -57,23 +51,6 @@ class Agent:
             case SpreadAction(cell, direction):
                 self.spread(self._board, (cell.r, cell.q, direction.r, direction.q), color)
                 
-    def get_possible_moves(self):
-        possible_moves = []
-        for i in range(7):
-            for j in range(7):
-                if not((i, j) in self._board):
-                    if  sum([x[1] for x in self._board.values()]) < 49:
-                        possible_moves.append(SpawnAction(HexPos(i, j)))
-                else:
-                    color = self._board[(i, j)][0]
-                    if color == PlayerColor.BLUE and self._color == PlayerColor.BLUE:
-                        for direction in DIRECTIONS:
-                            possible_moves.append(SpreadAction(HexPos(i, j), direction))
-                    elif color == PlayerColor.RED and self._color == PlayerColor.RED:
-                        for direction in DIRECTIONS:
-                            possible_moves.append(SpreadAction(HexPos(i,j), direction))  
-        return possible_moves
-    
     def spread(self, board, move, color):
         """ 
         Based on the given SpreadType tuple, this mutates the input board to perform
@@ -96,19 +73,3 @@ class Agent:
             else:
                 board[new_pos] = (color, 1)
         del board[curr_position]
-
-    def apply_action(self, board, action, color):
-        new_board = deepcopy(board)
-        match action:
-            case SpawnAction(cell):
-                if color == PlayerColor.RED:
-                    # 0 represents red
-                    new_board[(cell.r, cell.q)] = (PlayerColor.RED, 1) 
-                else:
-                    # 1 represents blue
-                    new_board[(cell.r, cell.q)] = (PlayerColor.BLUE, 1)
-            case SpreadAction(cell, direction):
-                self.spread(new_board, (cell.r, cell.q, direction.r, direction.q), color)
-        return new_board
-        
-        
@@ -2,17 +2,22 @@
 This is the main class for maintaining our Board based on the player's
 previous moves
 """
-from time import time
-from typing import Dict, Union as Result, Final, Tuple, Optional
-from copy import deepcopy
+import os
+from time import process_time
+from typing import Union as Result, Final, Tuple, Optional
 
 import numpy as np
-from mcts3.board.mcts import MCTS, BoardCSV, MCTS_Values
-from mcts3.board.node_chooser import greedy_action
-from mcts3.typedefs import BoardDict, BoardModError, ColorChar, SpreadType, SuccessMessage
+from mcts3.board.mcts import NodePool, NO_NODE, UNPROVEN, \
+    do_playout, game_value, get_game_state
+from mcts3.board.rollout import EXCHANGE_CACHE, GREEDY_CACHE
+from mcts3.board.snapshot import SNAPSHOT_PATH, read_snapshot
+from mcts3.typedefs import BoardDict, BoardModError, ColorChar, GameState, SpreadType, SuccessMessage
 from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexDir
 from referee.game.hex import HexPos, HexVec
+from mcts3.library.geometry import encode_move, decode_move
+from mcts3.library.position import Position
+from mcts3.time_manager import CHECK_INTERVAL
 
 INITIAL_POINTS: Final[int] = 1
 
@@ -20,14 +25,18 @@ class Board:
     """
     Maintains the board from the point of view of the Agent
     """
-    # Father of all MCTS nodes
-    adam: MCTS = {}
-    actions: Dict[str, Action] = {}
+    # Every MCTS node lives in this pool, rooted at the current position
+    tree: NodePool = NodePool()
+    # Scratch position, reset to the real board and walked down each iteration
+    position: Position = Position()
 
-    def __init__(self, board_dict: Optional[BoardDict] = None) -> None:
+    def __init__(self, board_dict: Optional[BoardDict] = None, preload: bool = True) -> None:
         if board_dict is None:
             board_dict = {}
         self.board_dict: BoardDict = board_dict
+        if preload and Board.tree.size == 0 and os.path.exists(SNAPSHOT_PATH):
+            # Start from the tree searched offline for the opening
+            read_snapshot(Board.tree)
 
     def update_board(self, action: Action, color: PlayerColor) \
         -> Result[SuccessMessage, BoardModError]:
@@ -110,13 +119,20 @@ class Board:
 
         return None
 
-    @staticmethod
-    def from_BoardCSV(board: BoardCSV) -> 'Board':
+    def advance_tree(self, action: Action) -> None:
         """
-        Converts the current board_csv into a Board type
+        Follows a played action down the MCTS tree so its subtree is reused
         """
-        board_dict = parse_input(str(board))
-        return Board(board_dict)
+        Board.tree.advance(encode_move(action))
+
+    def limit_memory(self, space_remaining: Optional[float]) -> None:
+        """
+        Caps the MCTS tree and the rollout caches by the space (in MB) the
+        referee says is left
+        """
+        Board.tree.limit_memory(space_remaining)
+        EXCHANGE_CACHE.limit_memory(space_remaining)
+        GREEDY_CACHE.limit_memory(space_remaining)
 
     def train_MCTS(self, color: PlayerColor, num_moves: int) -> float:
         """
@@ -124,102 +140,67 @@ class Board:
         Monte Carlo tree
         Return: The time it took to build the tree
         """
-        starting_time = time()
-
-        original_board: BoardCSV = BoardCSV.from_Board(self.board_dict)
-        chosen_node: MCTS_Values
-        if original_board not in Board.adam:
-            chosen_node = MCTS_Values(original_board, color=color)
-            Board.adam[original_board] = chosen_node
-            # print(f"\n\nOVER HERE\n\nBoard.adam: {Board.adam}")
+        starting_time = process_time()
+
+        tree = Board.tree
+        position = Board.position
+        position.load(self.board_dict, color, num_moves)
+        original_board = position.key()
+        if tree.root == NO_NODE or tree.key(tree.root) != original_board:
+            tree.reset(original_board, color)
+        chosen_node: int = tree.root
+        if tree.status[chosen_node] != UNPROVEN:
+            # The result is already known, so there is nothing left to search
+            return process_time() - starting_time
+
+        # Descend by upper confidence bound until a node has earned a new child
+        while not tree.should_expand(chosen_node, position):
+            chosen_node = tree.select(chosen_node)
+            position.make(int(tree.move[chosen_node]))
+
+        # Expand it with its best untried move
+        new_move = tree.next_move(chosen_node)
+        position.make(new_move)
+        new_node = tree.add(position.key(), chosen_node, new_move)
+
+        # Execute playout from the new position and walk the result back up
+        game_state = get_game_state(position)
+        if game_state != GameState.PLAYING:
+            tree.prove_terminal(new_node, game_state)
         else:
-            chosen_node = Board.adam[original_board]
-
-        while chosen_node.playouts != 0:
-            # Use MCTS_Values to get upper_confidence bounds to choose a child
-            children = chosen_node.children.items()
-
-            if len(children) <= 5:
-                break
-
-            playouts: int = chosen_node.playouts
-            chosen_node = max(
-                children,
-                key=lambda x: x[1].get_upper_confidence_bound(playouts)
-            )[1]
-
-        # Expand the chosen node once
-        curr_board: Board = Board.from_BoardCSV(chosen_node.curr_board)
-
-        new_action: Action
-        if len(curr_board.board_dict) == 0:
-            new_action = SpawnAction(HexPos(3, 3))
-            curr_board.update_board(new_action, color)
-            new_board: BoardCSV = BoardCSV.from_Board(curr_board.board_dict)
+            game_state = do_playout(position)
+        if game_state == GameState.PLAYING:
+            tree.defer(new_node, position)
         else:
-            color_char: ColorChar = 'r' \
-                    if color == PlayerColor.RED \
-                    else 'b'
-            action_iter = greedy_action(curr_board.board_dict, color_char, num_moves)
-            new_action = action_iter.__next__()
-            new_board = self.get_new_board(color, curr_board, new_action)
-            while new_board in chosen_node.children:
-                new_action = action_iter.__next__()
-                new_board = self.get_new_board(color, curr_board, new_action)
-
-        board_connector = original_board.get_BoardCSV_connector(new_board)
-        Board.actions[board_connector] = new_action
-        new_node = MCTS_Values(new_board, chosen_node)
-
-        # Execute playout
-        increment = new_node.do_playout(curr_board, num_moves + 1)
-
-        inverse_increment_map = {
-            0 : 1, 1 : 0, 0.5 : 0.5
-        }
-
-        for board_csv in new_node.derives_from:
-            curr_board_csv = Board.adam[board_csv]
-            if curr_board_csv.color_to_move == color:
-                curr_board_csv.num_wins += increment
-            else:
-                curr_board_csv.num_wins += inverse_increment_map[increment]
-            curr_board_csv.playouts += 1
-
-        chosen_node.children[new_board] = new_node
-        # Add the modified version of the current line
-        Board.adam[new_board] = new_node
-        # TODO: Find a way to export the data to json for pre-loading data
-        # TODO: Implement (in __init__) a way to load the pre-trained data
-        return time() - starting_time
-
-    def get_new_board(self, color, curr_board, new_action):
-        candidate_board = deepcopy(curr_board)
-        candidate_board.update_board(new_action, color)
-        new_board = BoardCSV.from_Board(candidate_board.board_dict)
-        return new_board
+            tree.backpropagate(new_node, game_value(game_state), position.history)
+        return process_time() - starting_time
+
+    def visit_gap(self) -> float:
+        """
+        How far ahead in visits the most visited move of the current tree is
+        """
+        return Board.tree.visit_gap(Board.tree.root)
 
     def find_action(self) -> Action:
         """
         Finds the best action to take based on the created MCTS tree
         """
-        original_board: BoardCSV = BoardCSV.from_Board(self.board_dict)
-        chosen_node = Board.adam[original_board]
-        most_playouts_node = max(
-            chosen_node.children.items(),
-            key=lambda x: x[1].playouts
-        )[0]
-        board_connector = original_board.get_BoardCSV_connector(most_playouts_node)
-        return Board.actions[board_connector]
-
-def parse_input(board_csv: str) -> BoardDict:
+        tree = Board.tree
+        tree.flush()
+        return decode_move(int(tree.move[tree.best_child(tree.root)]))
+
+def search_action(board_dict: BoardDict, color: PlayerColor, num_moves: int,
+                  seconds: float) -> Action:
     """
-    Parse board_csv into a dictionary of board cell states.
+    The action a search from scratch settles on after seconds of CPU time,
+    used offline to pick the opening book's moves
     """
-    return { # type: ignore
-        (int(r), int(q)): (p.strip(), int(k)) # type: ignore
-        for r, q, p, k in [
-            line.split(',') for line in board_csv.splitlines()
-            if len(line.strip()) > 0
-        ]
-    }
+    board = Board(dict(board_dict), preload=False)
+    Board.tree.reset_empty()
+    deadline = process_time() + seconds
+    while True:
+        for _ in range(CHECK_INTERVAL):
+            board.train_MCTS(color, num_moves)
+        if process_time() >= deadline:
+            break
+    return board.find_action()
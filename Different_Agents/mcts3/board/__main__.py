@@ -0,0 +1,40 @@
+"""
+Offline builds of the files the mcts3 agent preloads:
+    python -m mcts3.board snapshot [--iterations N] [--reply-iterations N]
+    python -m mcts3.board book [--games N] [--seconds S]
+"""
+import argparse
+from functools import partial
+
+from mcts3.board import search_action
+
+from mcts3.board.snapshot import DEFAULT_ITERATIONS, DEFAULT_REPLY_ITERATIONS, SNAPSHOT_PATH, \
+    build_snapshot
+from mcts3.library.book import BOOK_GAMES, BOOK_PATH, BOOK_SEARCH_SECONDS, BOOK_TURNS, build_book
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m mcts3.board")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = commands.add_parser("snapshot", help="search the opening and save the tree")
+    snapshot.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                          help="iterations from the empty board, RED to move")
+    snapshot.add_argument("--reply-iterations", type=int, default=DEFAULT_REPLY_ITERATIONS,
+                          help="iterations below each of RED's opening spawns")
+    snapshot.add_argument("--path", default=SNAPSHOT_PATH)
+
+    book = commands.add_parser("book", help="play the opening out and save the moves picked")
+    book.add_argument("--games", type=int, default=BOOK_GAMES)
+    book.add_argument("--seconds", type=float, default=BOOK_SEARCH_SECONDS,
+                      help="CPU time searched for each move")
+    book.add_argument("--turns", type=int, default=BOOK_TURNS)
+    book.add_argument("--path", default=BOOK_PATH)
+
+    args = parser.parse_args()
+    if args.command == "snapshot":
+        build_snapshot(args.iterations, args.reply_iterations, args.path)
+    elif args.command == "book":
+        build_book(partial(search_action, seconds=args.seconds), args.games, args.turns, args.path)
+
+if __name__ == "__main__":
+    main()
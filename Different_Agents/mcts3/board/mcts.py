@@ -2,12 +2,16 @@
 File that carries out the responsilities of initiating and performing the
 Monte Carlo Tree Search algorithm
 """
-from copy import deepcopy
-import re
-from typing import Final, Dict, List, Optional, Set
-from math import sqrt, log10
-from mcts3.board.node_chooser import greedy_action
-from mcts3.typedefs import BoardDict, BoardKey, ColorChar, GameState
+from array import array
+from typing import Final, Dict, List, Optional, Set, Tuple
+from math import inf, sqrt, log10
+import numpy as np
+from random import Random
+from mcts3.board.rollout import ROLLOUT_POLICIES
+from mcts3.typedefs import GameState
+from mcts3.library.geometry import NUM_CELLS, cell_index, spawn_id
+from mcts3.library.heuristics import power_difference_batch
+from mcts3.library.position import Position
 
 from referee.game.player import PlayerColor
 
@@ -20,157 +24,536 @@ ENDGAME: Set[GameState] = {
 }
 MAX_NUM_MOVES: Final[int] = 343
 CUTOFF_DEPTH: Final[int] = 6
+# Cut-off playouts are scored as P(red wins) = 1 / (1 + exp(-power difference / EVAL_SCALE)),
+# fitted to the results of exchange-policy self-play games
+EVAL_SCALE: Final[float] = 4.0
+# Cut-off positions are queued and evaluated together once this many are waiting
+EVAL_BATCH: Final[int] = 64
+# Chance red wins credited to a queued playout until its batch is evaluated
+PENDING_VALUE: Final[float] = 0.5
+INITIAL_CAPACITY: Final[int] = 1 << 14
+NO_NODE: Final[int] = -1
+NO_MOVE: Final[int] = -1
+# One of rollout.ROLLOUT_POLICIES, used to pick the moves of every playout
+ROLLOUT_POLICY: Final[str] = "exchange"
+# RAVE: the AMAF value of a move carries weight sqrt(K / (3N + K)) at a node
+# with N visits, so it dominates early on and fades as real visits come in
+RAVE_EQUIVALENCE: Final[float] = 300
+# Progressive widening: a node with N visits may have WIDENING_K * N^WIDENING_ALPHA children
+WIDENING_K: Final[float] = 2
+WIDENING_ALPHA: Final[float] = 0.5
 # MAX_NUM_MOVES: Final[int] = 10
+# Proven results of a node, for the player who moved into it
+UNPROVEN: Final[int] = 0
+PROVEN_WIN: Final[int] = 1
+PROVEN_LOSS: Final[int] = -1
+PROVEN_DRAW: Final[int] = 2
 
-class BoardCSV:
+# Every per-node column of the NodePool, and the value of a fresh node
+NODE_COLUMNS: Final[Tuple[Tuple[str, int], ...]] = (
+    ("wins", 0), ("visits", 0), ("parent", NO_NODE),
+    ("first_child", NO_NODE), ("next_sibling", NO_NODE),
+    ("move", NO_MOVE), ("color_to_move", 0), ("keys", 0),
+    ("num_children", 0), ("num_proven", 0), ("status", UNPROVEN),
+    ("amaf_wins", 0), ("amaf_visits", 0)
+)
+# Bytes a node costs: its row of every column, plus an allowance for the
+# untried move list of an expanded node
+NODE_BYTES: Final[int] = 8 + 4 + 4 + 4 + 4 + 2 + 1 + NUM_CELLS + 2 + 2 + 1 + 8 + 4 + 256
+# Fraction of the referee's remaining space the tree may grow into
+MEMORY_SHARE: Final[float] = 0.5
+MIN_NODES: Final[int] = 1 << 12
+# Fraction of the pool released at once when it is full
+EVICT_FRACTION: Final[float] = 1 / 16
+
+_rng = Random()
+
+class NodePool:
     """
-    Enforces a new BoardCSV-typed declaration raises an error if not made
-    properly
+    Struct-of-arrays storage for the nodes of a Monte-Carlo Tree. A node is an
+    index into the columns below; children form a singly linked list through
+    first_child/next_sibling, and parent links let backpropagation walk
+    straight up to the root. Each node keeps the 49-byte key of its board
+    and the id of the move on the edge from its parent.
+    Children are added by progressive widening: the first time a node is
+    expanded its moves are ordered once, and further children are taken off
+    that list as the node's visit count allows.
+    Each node also keeps all-moves-as-first (AMAF) statistics for the move
+    that reached it: every playout through its parent in which the same
+    player made that move later on counts towards them.
+    Nodes whose result is known for certain carry a proven status, worked out
+    with minimax rules as terminal positions are found, and are no longer
+    searched.
+    When the root moves on, the nodes that can no longer be reached are
+    dropped and the rest packed to the front. The pool may be capped at
+    max_nodes, in which case the least visited leaves make room for new ones.
     """
-    # valid pattern:   "1,2,r,3\n"
-    # invalid pattern: "1,2,r,3"
-    # invalid pattern: "1,2,a,3\n"
-    # invalid pattern: "1,9,r,3\n"
-    # invalid pattern: "1, 2, r, 3\n"
-    pattern = re.compile(r"([0-6],[0-6],[rb],\d\n)+")
-    def __init__(self, string: str) -> None:
-        if len(string) > 0 and not BoardCSV.pattern.match(string):
-            raise ValueError(f"Not a valid CSV representation of the Board\n{string}\n")
-        self.string = string
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        self.size: int = 0
+        # float because of the possibility of a draw
+        self.wins = np.zeros(capacity, dtype=np.float64)
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.parent = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.first_child = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.next_sibling = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.move = np.full(capacity, NO_MOVE, dtype=np.int16)
+        self.color_to_move = np.zeros(capacity, dtype=np.int8)
+        self.keys = np.zeros((capacity, NUM_CELLS), dtype=np.int8)
+        self.num_children = np.zeros(capacity, dtype=np.int16)
+        self.num_proven = np.zeros(capacity, dtype=np.int16)
+        self.status = np.zeros(capacity, dtype=np.int8)
+        self.amaf_wins = np.zeros(capacity, dtype=np.float64)
+        self.amaf_visits = np.zeros(capacity, dtype=np.int32)
+        # Moves not yet expanded, best last, for nodes expanded at least once
+        self.untried: Dict[int, array] = {}
+        self.root: int = NO_NODE
+        # Released node slots, and the most nodes the pool may hold (no limit
+        # when None)
+        self.free: List[int] = []
+        self.max_nodes: Optional[int] = None
+        # Cut-off playouts waiting for their evaluation, already visited and
+        # credited PENDING_VALUE, and the children each one credited for AMAF
+        self.pending_nodes: List[int] = []
+        self.pending_amaf: List[List[int]] = []
+        self.pending_positions = np.zeros((EVAL_BATCH, NUM_CELLS), dtype=np.int8)
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self.wins)
+        if self.max_nodes is not None:
+            capacity = max(self.size + 1, min(capacity, self.max_nodes))
+        for column, fill in NODE_COLUMNS:
+            old = getattr(self, column)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, column, new)
+
+    def reset(self, key: bytes, color: PlayerColor) -> int:
+        """
+        Drops every node and starts a new tree rooted at the given board
+        """
+        self.reset_empty()
+        self.root = self.add(key, color=color)
+        return self.root
+
+    def reset_empty(self) -> None:
+        """
+        Drops every node, leaving no root
+        """
+        self.untried.clear()
+        self.free.clear()
+        self.pending_nodes.clear()
+        self.pending_amaf.clear()
+        self.size = 0
+        self.root = NO_NODE
+
+    def add(self, key: bytes, parent: int = NO_NODE, move: int = NO_MOVE,
+            color: Optional[PlayerColor] = None) -> int:
+        """
+        Adds a node for the board with the given key below parent (reached by
+        move), returning its index. Root nodes need the color to move instead
+        of a parent.
+        """
+        assert(parent != NO_NODE or color is not None)
+        if not self.free and self.max_nodes is not None and self.size >= self.max_nodes:
+            self.evict(parent)
+        if self.free:
+            node = self.free.pop()
+        else:
+            if self.size == len(self.wins):
+                self._grow()
+            node = self.size
+            self.size += 1
+        for column, fill in NODE_COLUMNS:
+            getattr(self, column)[node] = fill
+        self.keys[node] = np.frombuffer(key, dtype=np.int8)
+
+        if parent != NO_NODE:
+            self.parent[node] = parent
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+            self.num_children[parent] += 1
+            self.move[node] = move
+            self.color_to_move[node] = 1 - self.color_to_move[parent]
+        else:
+            assert color is not None
+            self.color_to_move[node] = color.value
+        return node
+
+    def key(self, node: int) -> bytes:
+        return self.keys[node].tobytes()
+
+    def children(self, node: int) -> List[int]:
+        child = int(self.first_child[node])
+        children: List[int] = []
+        while child != NO_NODE:
+            children.append(child)
+            child = int(self.next_sibling[child])
+        return children
+
+    def child_with_move(self, node: int, move: int) -> int:
+        """
+        The child of node reached by move, or NO_NODE if it was never expanded
+        """
+        child = int(self.first_child[node])
+        while child != NO_NODE and self.move[child] != move:
+            child = int(self.next_sibling[child])
+        return child
+
+    def advance(self, move: int) -> None:
+        """
+        Moves the root down the edge of a move that was just played, keeping
+        the statistics gathered below it and releasing every other node
+        """
+        self.flush()
+        if self.root != NO_NODE:
+            self.root = self.child_with_move(self.root, move)
+        if self.root != NO_NODE:
+            self.parent[self.root] = NO_NODE
+            self.compact()
+        else:
+            self.reset_empty()
+
+    def compact(self) -> None:
+        """
+        Moves the subtree under the root to the front of the pool, in
+        breadth-first order, and drops everything else
+        """
+        order: List[int] = [self.root]
+        for node in order:
+            order.extend(self.children(node))
+        old_nodes = np.array(order, dtype=np.int32)
+        new_index = np.full(len(self.wins), NO_NODE, dtype=np.int32)
+        new_index[old_nodes] = np.arange(len(order), dtype=np.int32)
+
+        def remap(links: np.ndarray) -> np.ndarray:
+            return np.where(links == NO_NODE, NO_NODE, new_index[links])
 
-    def __str__(self) -> str:
-        return self.string
+        for column, _ in NODE_COLUMNS:
+            values = getattr(self, column)[old_nodes]
+            if column in ("parent", "first_child", "next_sibling"):
+                values = remap(values)
+            getattr(self, column)[:len(order)] = values
+        self.untried = {
+            int(new_index[node]): moves for node, moves in self.untried.items()
+            if new_index[node] != NO_NODE
+        }
+        self.free.clear()
+        self.size = len(order)
+        self.root = 0
 
-    def __eq__(self, str_value) -> bool:
-        return self.string == str_value
+    def limit_memory(self, space_remaining: Optional[float]) -> None:
+        """
+        Caps the pool so that it grows into at most MEMORY_SHARE of the
+        space (in MB) the referee says is left
+        """
+        if space_remaining is None:
+            self.max_nodes = None
+            return
+        spare_nodes = int(MEMORY_SHARE * space_remaining * (1 << 20) / NODE_BYTES)
+        self.max_nodes = max(MIN_NODES, self.size - len(self.free) + spare_nodes)
+
+    def evict(self, keep: int) -> None:
+        """
+        Releases the least visited EVICT_FRACTION of the unproven leaves
+        (never keep or the root), handing their moves back to their parents
+        so they can be expanded again later
+        """
+        self.flush()
+        size = self.size
+        leaves = np.flatnonzero(
+            (self.first_child[:size] == NO_NODE) & (self.parent[:size] != NO_NODE)
+            & (self.status[:size] == UNPROVEN))
+        leaves = leaves[leaves != keep]
+        count = min(len(leaves), max(1, int(EVICT_FRACTION * size)))
+        if count == 0:
+            return
+        victims = leaves[np.argpartition(self.visits[leaves], count - 1)[:count]]
+        for node in victims.tolist():
+            parent = int(self.parent[node])
+            # Unlink node from its parent's list of children
+            if self.first_child[parent] == node:
+                self.first_child[parent] = self.next_sibling[node]
+            else:
+                sibling = int(self.first_child[parent])
+                while self.next_sibling[sibling] != node:
+                    sibling = int(self.next_sibling[sibling])
+                self.next_sibling[sibling] = self.next_sibling[node]
+            self.num_children[parent] -= 1
+            if parent in self.untried:
+                self.untried[parent].insert(0, int(self.move[node]))
+            self.untried.pop(node, None)
+            self.parent[node] = NO_NODE
+            self.free.append(node)
 
-    @staticmethod
-    def from_Board(board: BoardDict) -> 'BoardCSV':
+    def should_expand(self, node: int, position: Position) -> bool:
         """
-        Makes a BoardCSV object from a non-empty BoardDict
+        Whether node, whose board is the given position, has earned another
+        child. Orders the node's moves the first time it is asked.
         """
-        tokens: List[BoardKey] = sorted(
-            list(board),
-            key=lambda x: int(f"{x[0]}{x[1]}"))
+        untried = self.untried.get(node)
+        if untried is None:
+            untried = ordered_moves(position)
+            if self.num_children[node]:
+                # Children read from a snapshot arrive without their move list
+                expanded = set(self.move[self.children(node)].tolist())
+                untried = array('h', [move for move in untried if move not in expanded])
+            self.untried[node] = untried
+        if not untried:
+            return False
+        if self.num_proven[node] == self.num_children[node]:
+            # Every child so far is settled, so only a new one can be searched
+            return True
+        limit = max(1, int(WIDENING_K * float(self.visits[node]) ** WIDENING_ALPHA))
+        return self.num_children[node] < limit
 
-        fin_str = ""
-        for r_value, q_value in tokens:
-            color, points = board[(r_value, q_value)]
-            fin_str += f"{r_value},{q_value},{color},{points}\n"
-        return BoardCSV(fin_str)
+    def select(self, node: int) -> int:
+        """
+        The unproven child of node with the highest upper confidence bound,
+        scored for all children at once. A child without visits is taken
+        straight away.
+        """
+        children = np.array(self.children(node), dtype=np.int32)
+        children = children[self.status[children] == UNPROVEN]
+        visits = self.visits[children]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return int(children[unvisited[0]])
+
+        visits = visits.astype(np.float64)
+        exploitation = self.wins[children] / visits
+        amaf_visits = self.amaf_visits[children]
+        # RAVE: blend in the AMAF value with weight beta where there is one
+        beta = np.where(amaf_visits > 0,
+                        np.sqrt(RAVE_EQUIVALENCE / (3 * visits + RAVE_EQUIVALENCE)), 0)
+        amaf_value = self.amaf_wins[children] / np.maximum(amaf_visits, 1)
+        exploitation += beta * (amaf_value - exploitation)
+        exploration = np.sqrt(log10(int(self.visits[node])) / visits)
+        return int(children[np.argmax(exploitation + C_FACTOR * exploration)])
 
-    def __hash__(self) -> int:
-        return hash(self.string)
+    def visit_gap(self, node: int) -> float:
+        """
+        How many more visits the most visited child of node has than the
+        runner-up, counting an unexpanded move as a child with none. Infinite
+        once node is proven or has a single move.
+        """
+        if self.status[node] != UNPROVEN:
+            return inf
+        visits = sorted((int(self.visits[child]) for child in self.children(node)), reverse=True)
+        if self.untried.get(node):
+            visits.append(0)
+        if len(visits) < 2:
+            return inf
+        return visits[0] - visits[1]
 
-    def get_BoardCSV_connector(self, other: 'BoardCSV') -> str:
+    def prove(self, node: int, status: int) -> None:
         """
-        Returns a JSON-storable connector between two board states
+        Records a proven result for node and passes it up: a parent is lost
+        for the player who moved into it as soon as one child is a proven
+        win, and is otherwise settled once all of its moves are proven
         """
-        return f"{self.string} | {str(other)}"
+        while True:
+            self.status[node] = status
+            parent = int(self.parent[node])
+            if parent == NO_NODE:
+                return
+            self.num_proven[parent] += 1
+            if status == PROVEN_WIN:
+                status = PROVEN_LOSS
+            elif self.untried[parent] or self.num_proven[parent] < self.num_children[parent]:
+                return
+            else:
+                child_statuses = {int(self.status[child]) for child in self.children(parent)}
+                status = PROVEN_DRAW if PROVEN_DRAW in child_statuses else PROVEN_WIN
+            node = parent
 
-class MCTS_Values:
+    def prove_terminal(self, node: int, game_state: GameState) -> None:
+        """
+        Proves a node whose position is a finished game
+        """
+        if game_state == GameState.DRAW:
+            self.prove(node, PROVEN_DRAW)
+            return
+        # The player who moved into this node is the one not to move now
+        mover_is_red = self.color_to_move[node] != PlayerColor.RED.value
+        red_won = game_state == GameState.RED_WINS
+        self.prove(node, PROVEN_WIN if mover_is_red == red_won else PROVEN_LOSS)
+
+    def best_child(self, node: int) -> int:
+        """
+        The child to play from node: a proven win if there is one, otherwise
+        the most visited child that is not a proven loss
+        """
+        children = self.children(node)
+        for child in children:
+            if self.status[child] == PROVEN_WIN:
+                return child
+        candidates = [child for child in children if self.status[child] != PROVEN_LOSS]
+        return max(candidates or children, key=lambda x: self.visits[x])
+
+    def next_move(self, node: int) -> int:
+        """
+        The best move of node which does not have a child yet
+        """
+        return self.untried[node].pop()
+
+    def backpropagate(self, node: int, red_value: float, moves: List[int]) -> None:
+        """
+        Walks the parent links from node up to the root, counting a visit and
+        crediting each node with the playout result, given as the chance that
+        red wins, from the point of view of the player who moved into it.
+        moves are the moves of the whole iteration, starting at the root.
+        """
+        self.visit(node)
+        self.credit(node, red_value, moves)
+
+    def visit(self, node: int) -> None:
+        while node != NO_NODE:
+            self.visits[node] += 1
+            node = int(self.parent[node])
+
+    def credit(self, node: int, red_value: float, moves: List[int],
+               amaf_children: Optional[List[int]] = None) -> List[int]:
+        """
+        Credits every node from node up to the root with red_value, and every
+        child AMAF counts the playout for, returning those children. Given
+        the amaf_children of an earlier credit of PENDING_VALUE, only the
+        difference is added, and only to them: a child expanded since then
+        never had the pending AMAF visit.
+        """
+        pending = amaf_children is not None
+        offset = PENDING_VALUE if pending else 0
+        path: List[int] = []
+        while node != NO_NODE:
+            path.append(node)
+            node = int(self.parent[node])
+
+        credited: List[int] = []
+        for depth, node in enumerate(reversed(path)):
+            # The player who moved into this node is the one not to move now
+            to_move_value = red_value
+            if self.color_to_move[node] == PlayerColor.RED.value:
+                self.wins[node] += 1 - red_value - offset
+            else:
+                self.wins[node] += red_value - offset
+                to_move_value = 1 - red_value
+            if pending:
+                continue
+
+            # Every later move of the player to move here counts for the
+            # child it would have led to
+            later_moves = set(moves[depth::2])
+            child = int(self.first_child[node])
+            while child != NO_NODE:
+                if int(self.move[child]) in later_moves:
+                    self.amaf_visits[child] += 1
+                    self.amaf_wins[child] += to_move_value
+                    credited.append(child)
+                child = int(self.next_sibling[child])
+
+        if amaf_children is None:
+            return credited
+        for child in amaf_children:
+            # The player who moved into child is the one to move at its parent
+            if self.color_to_move[child] == PlayerColor.RED.value:
+                self.amaf_wins[child] += 1 - red_value - offset
+            else:
+                self.amaf_wins[child] += red_value - offset
+        return amaf_children
+
+    def defer(self, node: int, position: Position) -> None:
+        """
+        Queues the cut-off position of a playout from node for evaluation.
+        The path is visited and credited an even PENDING_VALUE straight away,
+        which flush() corrects to the real value, so a queued line looks
+        neither lost nor won in the meantime.
+        """
+        self.visit(node)
+        amaf_children = self.credit(node, PENDING_VALUE, position.history)
+        self.pending_positions[len(self.pending_nodes)] = \
+            np.frombuffer(position.cells, dtype=np.int8)
+        self.pending_nodes.append(node)
+        self.pending_amaf.append(amaf_children)
+        if len(self.pending_nodes) == EVAL_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Evaluates every queued position in one batch and backs the values up
+        """
+        count = len(self.pending_nodes)
+        if count == 0:
+            return
+        values = leaf_values(self.pending_positions[:count])
+        for node, red_value, amaf_children in zip(
+                self.pending_nodes, values.tolist(), self.pending_amaf):
+            self.credit(node, red_value, [], amaf_children)
+        self.pending_nodes.clear()
+        self.pending_amaf.clear()
+
+def ordered_moves(position: Position) -> array:
     """
-    Representation of the values of a single node in a Monte-Carlo Tree
+    Every legal move of the position, ordered worst to best by the power
+    difference they leave the mover with
     """
-    def __init__(self, curr_board: BoardCSV, parent: Optional['MCTS_Values'] = None, color: Optional[PlayerColor] = None) -> None:
-        # float because of the possibility of a draw
-        self.num_wins: int | float = 0
-        self.playouts: int = 0
-        self.curr_board: BoardCSV = curr_board
-        self.derives_from: Set[BoardCSV] = set()
-        self.children: MCTS = {}
-        self.color_to_move: PlayerColor
-        assert(parent is not None or color is not None)
-        chosen_color: PlayerColor
-        if parent is not None:
-            self.derives_from.update(parent.derives_from)
-            self.derives_from.add(parent.curr_board)
-            chosen_color = PlayerColor.BLUE \
-                    if parent.color_to_move == PlayerColor.RED \
-                    else PlayerColor.RED
-        else:
-            assert color is not None
-            chosen_color = color
-        self.color_to_move = chosen_color
-
-    def get_upper_confidence_bound(self, playouts_parent) -> float:
-        """
-        A selection policy, derived from reinforcement learning to determine
-        the priority of a node
-        """
-        if self.playouts == 0:
-            # Avoid zero-division error
-            return 10
-        exploitation_term = self.num_wins / self.playouts
-        exploration_term = sqrt(log10(playouts_parent) / self.playouts)
-        return exploitation_term + C_FACTOR * exploration_term
-
-    def do_playout(self, board, num_moves: int): # type: ignore
-        """
-        Executes the playout of the game, only noting down the final result
-        """
-        simulated_games = 0
-        board = deepcopy(board) # type: ignore
-        curr_game_state = get_game_state(board, num_moves, simulated_games)
-        color_char: ColorChar = 'r' \
-                if self.color_to_move == PlayerColor.BLUE \
-                else 'b'
-        current_player: PlayerColor = PlayerColor.RED \
-                if self.color_to_move == PlayerColor.BLUE \
-                else PlayerColor.BLUE
-        while curr_game_state not in ENDGAME:
-            # track(board, "prev board:", "tracker.txt")
-            next_action = greedy_action(board.board_dict, color_char, num_moves).__next__()
-            # track(board, "curr board", "tracker1.txt")
-
-            board.update_board(next_action, current_player)
-            num_moves += 1
-            simulated_games += 1
-            curr_game_state = get_game_state(board, num_moves, simulated_games)
-            color_char = 'r' \
-                if color_char == 'b' \
-                else 'b'
-            current_player = PlayerColor.RED \
-                if current_player == PlayerColor.BLUE \
-                else PlayerColor.BLUE
-
-        winning_color: PlayerColor = PlayerColor.RED \
-                if curr_game_state == GameState.RED_WINS \
-                else PlayerColor.BLUE
-
-        increment: int | float
-        if winning_color == self.color_to_move:
-            increment = 1
-        elif curr_game_state == GameState.DRAW:
-            increment = 0.5
-        else:
-            # Assumption: The player must have lost at this point
-            increment = 0
+    if position.red_tokens + position.blue_tokens == 0:
+        # Every cell of the torus is alike, so one opening spawn is enough
+        return array('h', [spawn_id(cell_index(3, 3))])
+    color = position.color
+    scored = []
+    for move in position.legal_moves():
+        position.make(move)
+        scored.append((color * (position.red_power - position.blue_power), move))
+        position.unmake()
+    scored.sort(key=lambda x: x[0])
+    return array('h', [move for _, move in scored])
 
-        self.num_wins += increment
-        self.playouts += 1
-        return increment
+def do_playout(position: Position) -> GameState:
+    """
+    Executes the playout of the game on the scratch position with the
+    ROLLOUT_POLICY, leaving the position where it stopped. Playouts still
+    running after CUTOFF_DEPTH moves return GameState.PLAYING, and are left
+    for leaf_values to score.
+    """
+    policy = ROLLOUT_POLICIES[ROLLOUT_POLICY]
+    simulated_games = 0
+    curr_game_state = get_game_state(position)
+    while curr_game_state not in ENDGAME and simulated_games < CUTOFF_DEPTH:
+        position.make(policy(position, _rng))
+        simulated_games += 1
+        curr_game_state = get_game_state(position)
+    return curr_game_state
 
-def get_game_state(board, num_moves, simulated_games: int) -> GameState: # type: ignore
+def game_value(game_state: GameState) -> float:
+    """
+    The chance that red wins a finished game
+    """
+    if game_state == GameState.DRAW:
+        return 0.5
+    return 1 if game_state == GameState.RED_WINS else 0
+
+def leaf_values(positions: np.ndarray) -> np.ndarray:
+    """
+    The chance that red wins from each of an (N, 49) array of positions
+    """
+    power_difference = power_difference_batch(positions, PlayerColor.RED)
+    return 1 / (1 + np.exp(-power_difference / EVAL_SCALE))
+
+def get_game_state(position: Position) -> GameState:
     """
     Checks what the current state of the game is
     """
-    num_reds, num_blues = 0, 0
-    for (_, (color, _)) in board.board_dict.items(): # type: ignore
-        match color:
-            case 'r':
-                num_reds += 1
-            case 'b':
-                num_blues += 1
-
-    if num_moves >= MAX_NUM_MOVES or simulated_games > CUTOFF_DEPTH:
+    num_reds, num_blues = position.red_tokens, position.blue_tokens
+    num_moves = position.turn
+
+    if num_moves >= MAX_NUM_MOVES:
         if num_reds > num_blues:
             return GameState.RED_WINS
         if num_blues > num_reds:
             return GameState.BLUE_WINS
         return GameState.DRAW
 
-    if num_blues == 0 or num_reds == 0:
+    # Nobody can be eliminated before both players have moved
+    if num_moves >= 2 and (num_blues == 0 or num_reds == 0):
         return GameState.BLUE_WINS if num_reds == 0 else GameState.RED_WINS
 
     return GameState.PLAYING
@@ -191,5 +574,3 @@ def track(board, message: str, filename: str):
         for i in board_keys:
             finstring += f"{i}:{board.board_dict[i]}\n"
         file.write(finstring)
-
-MCTS = Dict[BoardCSV, MCTS_Values]
@@ -1,12 +1,15 @@
 """
 The place to implement heuristic-like functions
 """
-from typing import Generator, List
+from typing import Final, Generator, List
 from copy import deepcopy
 import math
 import numpy as np
 from mcts3.typedefs import BoardDict, ColorChar
-from mcts3.library.heuristics import token_difference_heuristic, power_difference_heuristic
+from mcts3.library.geometry import encode_move
+from mcts3.library.heuristics import token_difference_heuristic, power_difference_heuristic, \
+    power_difference_batch, successor_positions
+from mcts3.library.position import Bitboard, Position
 from referee.game.actions import Action, SpawnAction, SpreadAction
 from referee.game.hex import HexDir, HexPos
 from referee.game.player import PlayerColor
@@ -15,25 +18,33 @@ ALL_HEX_DIRS = [e.value for e in HexDir]
 DIRECTIONS = list(HexDir)
 PC_MAP = {'r': PlayerColor.RED, 'b': PlayerColor.BLUE}
 CUTOFF_DEPTH = 2
+# "dict" searches board dicts, "bitboard" the faster library.position.Bitboard
+BOARD_BACKEND: Final[str] = "dict"
 
 def greedy_action(board, color_char: ColorChar, turn_num: int) -> Generator[Action, None, None]:
-    move_values = []
     color: PlayerColor = PC_MAP[color_char]
-    board = make_greedy_board(board)
+    board = Bitboard.from_board(board) if BOARD_BACKEND == "bitboard" else make_greedy_board(board)
 
     for i in minimax(board, CUTOFF_DEPTH, True, -math.inf, math.inf, color, turn_num, board):
         yield i[1]
 
-    for move in get_possible_moves(board, color):
-        new_board = apply_action(board, move, color)
-        move_values.append((move, power_difference_heuristic(new_board, color)))
-    # shuffle(move_values)
-    move_values.sort(key = lambda x: x[1], reverse=True)
-    for i in move_values:
-        assert move_values[0] == max(move_values, key=lambda x: x[1])
-        yield i[0]
-
-def get_possible_moves(board: BoardDict, curr_color: PlayerColor):
+    moves = get_possible_moves(board, color)
+    if isinstance(board, Bitboard):
+        move_values = np.array([
+            power_difference(apply_action(board, move, color), color) for move in moves])
+    else:
+        # Score every one-ply successor in a single batched call, made
+        # on one scratch position instead of a copied board each
+        position = Position()
+        position.load(board, color, turn_num)
+        successors = successor_positions(position, [encode_move(move) for move in moves])
+        move_values = power_difference_batch(successors, color)
+    for index in np.argsort(-move_values, kind='stable'):
+        yield moves[index]
+
+def get_possible_moves(board: BoardDict | Bitboard, curr_color: PlayerColor):
+    if isinstance(board, Bitboard):
+        return board.legal_actions(curr_color)
     possible_moves: List[Action] = []
     for i in range(7):
         for j in range(7):
@@ -51,6 +62,8 @@ def get_possible_moves(board: BoardDict, curr_color: PlayerColor):
     return possible_moves
 
 def apply_action(board, action, color):
+    if isinstance(board, Bitboard):
+        return board.after(encode_move(action), color)
     new_board = deepcopy(board)
     match action:
         case SpawnAction(cell):
@@ -98,14 +111,14 @@ def make_greedy_board(board: BoardDict):
 def minimax(node, depth, isMaximizingPlayer, alpha, beta, color, turn, board):
     try:
         if depth == 0 or game_over(node, turn):
-            yield power_difference_heuristic(node, color), None
+            yield power_difference(node, color), None
 
         if isMaximizingPlayer:
             value = -math.inf
-            old_difference = token_difference_heuristic(node, color)
+            old_difference = token_difference(node, color)
             for move in get_possible_moves(node, color):
                 new_node = apply_action(node, move, color)
-                difference = token_difference_heuristic(new_node, color)
+                difference = token_difference(new_node, color)
                 if difference - old_difference <= 0:
                     continue
 
@@ -119,10 +132,10 @@ def minimax(node, depth, isMaximizingPlayer, alpha, beta, color, turn, board):
                 alpha = max(alpha, value)
         else:
             value = math.inf
-            old_difference = token_difference_heuristic(node, color)
+            old_difference = token_difference(node, color)
             for move in get_possible_moves(node, color.opponent):
                 new_node = apply_action(node, move, color.opponent)
-                difference = token_difference_heuristic(new_node, color)
+                difference = token_difference(new_node, color)
 
                 if difference - old_difference >= 0:
                     continue
@@ -140,12 +153,24 @@ def minimax(node, depth, isMaximizingPlayer, alpha, beta, color, turn, board):
         print("UnboundErrorEncountered")
         for move in get_possible_moves(board, color):
             new_board = apply_action(board, move, color)
-            move_values.append((move, power_difference_heuristic(new_board, color)))
+            move_values.append((move, power_difference(new_board, color)))
         move_values.sort(key= lambda x: x[1], reverse=True)
         for i in move_values:
             yield i[0]
 
+def power_difference(board, color):
+    if isinstance(board, Bitboard):
+        return board.power_difference(color)
+    return power_difference_heuristic(board, color)
+
+def token_difference(board, color):
+    if isinstance(board, Bitboard):
+        return board.token_difference(color)
+    return token_difference_heuristic(board, color)
+
 def game_over(board, turn):
+    if isinstance(board, Bitboard):
+        return board.eliminated() and turn > 2
     blue_tokens = {(b_x, b_y): (b_c, b_v) for (b_x, b_y), (b_c, b_v) in board.items() if b_c == PlayerColor.BLUE}
     red_tokens = {(r_x, r_y): (r_c, r_v) for (r_x, r_y), (r_c, r_v) in board.items() if r_c == PlayerColor.RED}
     if (len(blue_tokens) == 0 or len(red_tokens) == 0) and turn > 2:
@@ -0,0 +1,87 @@
+"""
+Root-parallel Monte Carlo Tree Search. Every worker process grows its own
+tree from the current board with its own random seed, and the statistics of
+the root's children are summed across workers to pick the move. The trees
+share nothing, so the workers never wait on each other.
+"""
+from random import Random
+from time import process_time
+from typing import Dict, List, Tuple
+
+from mcts3.board import Board, mcts
+from mcts3.board.mcts import PROVEN_LOSS, PROVEN_WIN, UNPROVEN
+from mcts3.library.geometry import decode_move
+from mcts3.library.search import WorkerPool
+from mcts3.time_manager import CHECK_INTERVAL
+from mcts3.typedefs import BoardDict
+from referee.game import Action, PlayerColor
+
+# (move id, visits, wins, proven status) of one child of a worker's root
+ChildStats = Tuple[int, int, float, int]
+
+def _grow_tree(board_dict: BoardDict, color: PlayerColor, turn: int,
+               seed: int, budget: float) -> Tuple[List[ChildStats], float]:
+    """
+    Worker side: searches for budget CPU seconds and reports the root's
+    children. Returns (children, cpu_seconds).
+    """
+    start = process_time()
+    mcts._rng.seed(seed)
+    board = Board(board_dict, preload=False)
+    tree = Board.tree
+    # A worker runs many tasks, and its tree from the last one must not be
+    # counted again
+    tree.reset_empty()
+    while process_time() - start < budget:
+        for _ in range(CHECK_INTERVAL):
+            board.train_MCTS(color, turn)
+        if tree.status[tree.root] != UNPROVEN:
+            break
+    tree.flush()
+    children = [
+        (int(tree.move[child]), int(tree.visits[child]),
+         float(tree.wins[child]), int(tree.status[child]))
+        for child in tree.children(tree.root)
+    ]
+    return children, process_time() - start
+
+def merge_children(results: List[List[ChildStats]]) -> int:
+    """
+    The move id to play given every worker's root children: a move any worker
+    proved a win, otherwise the move with the most visits in total (then the
+    most wins) that no worker proved a loss
+    """
+    totals: Dict[int, Tuple[int, float]] = {}
+    lost = set()
+    for children in results:
+        for move, visits, wins, status in children:
+            if status == PROVEN_WIN:
+                return move
+            if status == PROVEN_LOSS:
+                lost.add(move)
+            total_visits, total_wins = totals.get(move, (0, 0.0))
+            totals[move] = (total_visits + visits, total_wins + wins)
+    candidates = [move for move in totals if move not in lost] or list(totals)
+    return max(candidates, key=lambda move: totals[move])
+
+class RootParallelMcts(WorkerPool):
+    """
+    A process pool running one independent MCTS per worker
+    """
+    def __init__(self, processes: int) -> None:
+        super().__init__(processes)
+        self._seeds = Random()
+
+    def search(self, board_dict: BoardDict, color: PlayerColor, turn: int,
+               budget: float) -> Action:
+        """
+        Searches the board for color to move, spending about budget CPU
+        seconds across all the workers
+        """
+        futures = [
+            self._submit(_grow_tree, board_dict, color, turn,
+                         self._seeds.getrandbits(64), budget / self.processes)
+            for _ in range(self.processes)
+        ]
+        self._finish(futures)
+        return decode_move(merge_children([future.result()[0] for future in futures]))
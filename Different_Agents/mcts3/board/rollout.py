@@ -0,0 +1,221 @@
+"""
+Playout policies for the Monte Carlo Tree Search. A policy picks a move id
+for the side to move of a Position by looking only at the cells each move
+touches along the precomputed spread lines, so one simulated move costs
+O(moves) and never copies the board.
+"""
+from array import array
+from collections import OrderedDict
+from math import exp
+from random import Random
+from sys import getsizeof
+from typing import Callable, Dict, Final, List, Optional, Tuple
+
+from mcts3.board.node_chooser import greedy_action
+from mcts3.library.geometry import NUM_CELLS, NUM_DIRECTIONS, encode_move
+from mcts3.library.position import RED, SPREAD_LINES, Position
+from referee.game.constants import MAX_CELL_POWER, MAX_TOTAL_POWER
+
+RolloutPolicy = Callable[[Position, Random], int]
+
+# Chance of a uniformly random move under the capture policy
+EPSILON: Final[float] = 0.2
+# Softness of the exchange policy: lower values play the best exchange more often
+EXCHANGE_TEMPERATURE: Final[float] = 0.25
+# Exchange values lie in [-EXCHANGE_RANGE, EXCHANGE_RANGE], and
+# EXCHANGE_WEIGHTS[value + EXCHANGE_RANGE] is the sampling weight of a value
+EXCHANGE_RANGE: Final[int] = MAX_CELL_POWER * NUM_DIRECTIONS
+EXCHANGE_WEIGHTS: Final[List[float]] = [
+    exp(value / EXCHANGE_TEMPERATURE)
+    for value in range(-EXCHANGE_RANGE, EXCHANGE_RANGE + 1)
+]
+# Share of the space (in MB) the referee says is left that a rollout cache
+# may fill, and its size in bytes when the referee sets no limit
+CACHE_MEMORY_SHARE: Final[float] = 0.1
+CACHE_DEFAULT_BYTES: Final[int] = 16 << 20
+# Bytes an entry costs besides its board key and arrays: the OrderedDict
+# node and the key and entry tuples
+ENTRY_OVERHEAD: Final[int] = 200
+
+# (board key, colour to move, whether game_over can end the game yet)
+CacheKey = Tuple[bytes, int, bool]
+# The moves a policy picks from, in its order, and their cumulative weights
+CacheEntry = Tuple[array, array]
+
+class RolloutCache:
+    """
+    LRU cache of the moves a policy picks from in each position, with their
+    cumulative sampling weights. Playouts from one tree keep passing through
+    the same positions near it, so most of the scoring can be skipped. The
+    cache keeps an estimate of its own size and drops the least recently
+    used entries once that passes max_bytes.
+    """
+    def __init__(self, max_bytes: int = CACHE_DEFAULT_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.nbytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def entry_bytes(key: CacheKey, entry: CacheEntry) -> int:
+        return ENTRY_OVERHEAD + getsizeof(key[0]) + getsizeof(entry[0]) + getsizeof(entry[1])
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, entry: CacheEntry) -> None:
+        self.entries[key] = entry
+        self.nbytes += self.entry_bytes(key, entry)
+        self._shrink()
+
+    def limit_memory(self, space_remaining: Optional[float]) -> None:
+        """
+        Caps the cache at CACHE_MEMORY_SHARE of the space (in MB) the referee
+        says is left. Only the cache of ROLLOUT_POLICY fills during a game,
+        so each may take the whole share.
+        """
+        if space_remaining is None:
+            self.max_bytes = CACHE_DEFAULT_BYTES
+        else:
+            self.max_bytes = int(CACHE_MEMORY_SHARE * space_remaining * (1 << 20))
+        self._shrink()
+
+    def _shrink(self) -> None:
+        while self.nbytes > self.max_bytes and self.entries:
+            key, entry = self.entries.popitem(last=False)
+            self.nbytes -= self.entry_bytes(key, entry)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.nbytes = self.hits = self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"{len(self.entries)} entries, {self.nbytes / (1 << 20):.1f} of "
+                f"{self.max_bytes / (1 << 20):.1f} MB, hit rate {self.hit_rate:.2f}")
+
+EXCHANGE_CACHE: Final[RolloutCache] = RolloutCache()
+GREEDY_CACHE: Final[RolloutCache] = RolloutCache()
+
+def uniform_policy(position: Position, rng: Random) -> int:
+    """
+    Any legal move, all equally likely
+    """
+    return rng.choice(position.legal_moves())
+
+def capture_policy(position: Position, rng: Random) -> int:
+    """
+    Epsilon-greedy on captured power: usually the spread taking the most
+    enemy power (ties broken at random), otherwise a uniformly random move
+    """
+    if rng.random() < EPSILON:
+        return uniform_policy(position, rng)
+
+    cells = position.cells
+    color = position.color
+    best_gain = 0
+    best_moves: List[int] = []
+    for cell in range(NUM_CELLS):
+        power = cells[cell] * color
+        if power <= 0:
+            continue
+        for direction, line in enumerate(SPREAD_LINES[cell]):
+            gain = 0
+            for target in line[:power]:
+                value = cells[target] * color
+                if value < 0:
+                    gain -= value
+            if gain > best_gain:
+                best_gain = gain
+                best_moves = [NUM_CELLS + cell * NUM_DIRECTIONS + direction]
+            elif gain == best_gain and gain > 0:
+                best_moves.append(NUM_CELLS + cell * NUM_DIRECTIONS + direction)
+
+    if not best_moves:
+        return uniform_policy(position, rng)
+    return rng.choice(best_moves)
+
+def exchange_moves(position: Position) -> CacheEntry:
+    """
+    Every legal move with its cumulative exchange_policy weight, where a
+    move's weight is exp(value / EXCHANGE_TEMPERATURE) and its value is the
+    static exchange on the cells it touches: the enemy power it takes over
+    or knocks off, less the power of any of its own full stacks it knocks off
+    """
+    cells = position.cells
+    color = position.color
+    moves = array('h')
+    weights = array('d')
+    total = 0.0
+    if position.red_power + position.blue_power < MAX_TOTAL_POWER:
+        neutral = EXCHANGE_WEIGHTS[EXCHANGE_RANGE]
+        for cell in range(NUM_CELLS):
+            if cells[cell] == 0:
+                moves.append(cell)
+                total += neutral
+                weights.append(total)
+
+    for cell in range(NUM_CELLS):
+        power = cells[cell] * color
+        if power <= 0:
+            continue
+        for direction, line in enumerate(SPREAD_LINES[cell]):
+            value = 0
+            for target in line[:power]:
+                landed = cells[target] * color
+                # Enemy stacks change hands, and full stacks of either colour
+                # are removed
+                if landed < 0 or landed == MAX_CELL_POWER:
+                    value -= landed
+            moves.append(NUM_CELLS + cell * NUM_DIRECTIONS + direction)
+            total += EXCHANGE_WEIGHTS[value + EXCHANGE_RANGE]
+            weights.append(total)
+
+    return moves, weights
+
+def exchange_policy(position: Position, rng: Random) -> int:
+    """
+    Samples a move of exchange_moves by its weight, looking the moves up in
+    EXCHANGE_CACHE first
+    """
+    # The exchange values do not depend on the turn
+    key = (position.key(), position.color, False)
+    entry = EXCHANGE_CACHE.get(key)
+    if entry is None:
+        entry = exchange_moves(position)
+        EXCHANGE_CACHE.put(key, entry)
+    moves, cum_weights = entry
+    return rng.choices(moves, cum_weights=cum_weights)[0]
+
+def greedy_policy(position: Position, rng: Random) -> int:
+    """
+    The first move of node_chooser.greedy_action. Far slower than the
+    others, since it runs a shallow minimax on a board dict for every
+    position GREEDY_CACHE has not seen.
+    """
+    key = (position.key(), position.color, position.turn > 2)
+    entry = GREEDY_CACHE.get(key)
+    if entry is None:
+        color_char = 'r' if position.color == RED else 'b'
+        move = encode_move(next(greedy_action(position.board_dict(), color_char, position.turn)))
+        entry = array('h', [move]), array('d', [1.0])
+        GREEDY_CACHE.put(key, entry)
+    return entry[0][0]
+
+ROLLOUT_POLICIES: Final[Dict[str, RolloutPolicy]] = {
+    "uniform": uniform_policy,
+    "capture": capture_policy,
+    "exchange": exchange_policy,
+    "greedy": greedy_policy,
+}
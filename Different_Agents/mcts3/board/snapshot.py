@@ -0,0 +1,129 @@
+"""
+Binary snapshots of the MCTS node pool, so a tree grown offline can be
+picked up by the agent at no cost to its CPU clock.
+
+A snapshot is a fixed header followed by each column of NODE_COLUMNS in
+turn, every column holding `capacity` rows and padded to a multiple of 8
+bytes. Rows past `size` are spare room for the nodes the agent adds, left as
+holes in the file so they cost no disk. Reading maps the file copy-on-write,
+so columns are paged in as the search touches them, new nodes go into the
+spare rows without copying the pool, and any updates stay private to the
+process.
+
+The tree is searched from the empty board with RED to move, and below each
+of RED's opening spawns with BLUE to move, so it serves either colour: BLUE
+reaches its part by following RED's first move down from the root. Build it
+with `python -m mcts3.board snapshot`.
+"""
+import mmap
+import os
+import struct
+from typing import Final, Optional
+
+import numpy as np
+from mcts3.board.mcts import NODE_COLUMNS, NO_NODE, NodePool
+from mcts3.library.geometry import NUM_CELLS, cell_coordinates, spawn_id
+
+SNAPSHOT_PATH: Final[str] = os.path.join(os.path.dirname(__file__), "opening.tree")
+MAGIC: Final[bytes] = b"MCTSPOOL"
+VERSION: Final[int] = 2
+# Magic, version, number of nodes, rows per column, root
+HEADER: Final[struct.Struct] = struct.Struct("<8sIIIi")
+ALIGNMENT: Final[int] = 8
+DEFAULT_ITERATIONS: Final[int] = 200_000
+# Iterations spent on BLUE's reply to each of RED's opening spawns
+DEFAULT_REPLY_ITERATIONS: Final[int] = 4_000
+
+class SnapshotError(Exception):
+    """
+    Raised for files that are not snapshots of this version
+    """
+
+def _padded(length: int) -> int:
+    return -(-length // ALIGNMENT) * ALIGNMENT
+
+def write_snapshot(pool: NodePool, path: str = SNAPSHOT_PATH,
+                   spare: Optional[int] = None) -> None:
+    """
+    Writes every node of the pool, with room for spare more (as many again
+    as there are by default). Queued playouts are backed up first, and
+    released nodes are written as they are (unreachable from the root).
+    """
+    pool.flush()
+    size = pool.size
+    capacity = size + (size if spare is None else spare)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size, capacity, pool.root))
+        offset = _padded(HEADER.size)
+        for column, _ in NODE_COLUMNS:
+            values = getattr(pool, column)
+            file.seek(offset)
+            file.write(np.ascontiguousarray(values[:size]).tobytes())
+            offset += _padded(capacity * values[0].nbytes)
+        file.truncate(offset)
+
+def read_snapshot(pool: NodePool, path: str = SNAPSHOT_PATH) -> None:
+    """
+    Replaces the contents of the pool with a snapshot, mapping its columns
+    straight onto the file
+    """
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    magic, version, size, capacity, root = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"{path} is not a version {VERSION} node pool snapshot")
+
+    columns = {}
+    offset = _padded(HEADER.size)
+    for column, _ in NODE_COLUMNS:
+        template = getattr(pool, column)
+        shape = (capacity,) + template.shape[1:]
+        count = int(np.prod(shape))
+        columns[column] = np.frombuffer(
+            mapped, dtype=template.dtype, count=count, offset=offset
+        ).reshape(shape)
+        offset += _padded(count * template.itemsize)
+
+    pool.reset_empty()
+    for column, values in columns.items():
+        setattr(pool, column, values)
+    pool.size = size
+    pool.root = root
+
+def build_snapshot(iterations: int = DEFAULT_ITERATIONS,
+                   reply_iterations: int = DEFAULT_REPLY_ITERATIONS,
+                   path: str = SNAPSHOT_PATH) -> None:
+    """
+    Searches the empty board with RED to move, then the position after each
+    of RED's opening spawns with BLUE to move, and writes the one tree
+    """
+    # Imported here as mcts3.board imports this module
+    from mcts3.board import Board
+    from referee.game import PlayerColor
+
+    board = Board(preload=False)
+    tree = Board.tree
+    tree.reset_empty()
+    for _ in range(iterations):
+        board.train_MCTS(PlayerColor.RED, 0)
+
+    root = tree.root
+    for cell in range(NUM_CELLS):
+        reply = Board({cell_coordinates(cell): ('r', 1)}, preload=False)
+        move = spawn_id(cell)
+        child = tree.child_with_move(root, move)
+        if child == NO_NODE:
+            untried = tree.untried.get(root)
+            if untried is not None and move in untried:
+                untried.remove(move)
+            Board.position.load(reply.board_dict, PlayerColor.BLUE, 1)
+            child = tree.add(Board.position.key(), root, move)
+        # Searched as a root of its own, so RED's statistics are left alone
+        tree.parent[child] = NO_NODE
+        tree.root = child
+        for _ in range(reply_iterations):
+            reply.train_MCTS(PlayerColor.BLUE, 1)
+        tree.flush()
+        tree.parent[child] = root
+    tree.root = root
+    write_snapshot(tree, path)
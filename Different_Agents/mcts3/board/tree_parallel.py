@@ -0,0 +1,256 @@
+"""
+Tree-parallel Monte Carlo Tree Search. Every worker process grows the same
+tree, held in one shared memory block. A worker adds a virtual loss to each
+node on its way down, so the others see that path as worse and spread out
+over the tree, and takes the loss back as it backs up the real result.
+
+Updates to a node happen under one of LOCK_STRIPES locks picked by the node
+index, and new nodes and move lists are allocated under a separate lock. The
+locks are created before the workers are forked, which is how they inherit
+them. Reads during selection take no lock: a slightly stale count only
+nudges the choice of child.
+
+The shared tree keeps visits and wins only; the move order, widening and
+playouts are those of mcts.py, while RAVE and the solver stay with the
+single-process NodePool.
+"""
+from multiprocessing import get_context
+from random import Random
+from time import process_time
+from typing import Final, List, Tuple
+
+import numpy as np
+from mcts3.board import mcts
+from mcts3.board.mcts import C_FACTOR, NO_MOVE, NO_NODE, WIDENING_ALPHA, WIDENING_K, \
+    do_playout, game_value, get_game_state, leaf_values, ordered_moves
+from mcts3.library.geometry import decode_move
+from mcts3.library.position import Position
+from mcts3.library.search import WorkerPool, attach
+from mcts3.typedefs import BoardDict, GameState
+from referee.game import Action, PlayerColor
+
+LOCK_STRIPES: Final[int] = 64
+SHARED_CAPACITY: Final[int] = 1 << 17
+# Room in the move arena per node, on average
+ARENA_MOVES_PER_NODE: Final[int] = 24
+# Visits, all lost, that a worker adds to each node on its current path
+VIRTUAL_LOSS: Final[int] = 1
+# moves_start of a node whose moves have not been ordered yet
+NOT_ORDERED: Final[int] = -1
+
+# Layout of the block: a header, the node columns, then the move arena
+SIZE, ARENA_USED = range(2)
+HEADER_BYTES: Final[int] = 2 * 8
+SHARED_COLUMNS: Final[Tuple[Tuple[str, type], ...]] = (
+    ("wins", np.float64), ("visits", np.int32), ("virtual", np.int32),
+    ("parent", np.int32), ("first_child", np.int32), ("next_sibling", np.int32),
+    ("moves_start", np.int32), ("moves_count", np.int16), ("moves_taken", np.int16),
+    ("move", np.int16), ("color_to_move", np.int8)
+)
+
+# Created by TreeParallelMcts in the agent's process and inherited by the
+# workers it forks
+_STRIPE_LOCKS: List = []
+_ALLOCATION_LOCK: List = []
+
+class SharedTree:
+    """
+    Struct-of-arrays node storage laid over a shared buffer, with the same
+    links as NodePool: first_child/next_sibling lists and parent pointers.
+    Node 0 is the root. Each expanded node owns a slice of the move arena
+    holding its ordered moves, best last, of which moves_taken have children.
+    """
+    def __init__(self, buffer, capacity: int) -> None:
+        self.capacity = capacity
+        self.header = np.ndarray((2,), dtype=np.int64, buffer=buffer)
+        offset = HEADER_BYTES
+        for column, dtype in SHARED_COLUMNS:
+            setattr(self, column, np.ndarray(
+                (capacity,), dtype=dtype, buffer=buffer, offset=offset))
+            offset += capacity * np.dtype(dtype).itemsize
+        self.arena = np.ndarray(
+            (capacity * ARENA_MOVES_PER_NODE,), dtype=np.int16,
+            buffer=buffer, offset=offset)
+
+    @staticmethod
+    def nbytes(capacity: int) -> int:
+        node_bytes = sum(np.dtype(dtype).itemsize for _, dtype in SHARED_COLUMNS)
+        return HEADER_BYTES + capacity * (node_bytes + 2 * ARENA_MOVES_PER_NODE)
+
+    def reset(self, color: PlayerColor) -> None:
+        """
+        Leaves only a fresh root, with color to move
+        """
+        self.header[:] = (1, 0)
+        self._init_node(0, NO_NODE, NO_MOVE, color.value)
+
+    def _init_node(self, node: int, parent: int, move: int, color: int) -> None:
+        self.wins[node] = 0
+        self.visits[node] = 0
+        self.virtual[node] = 0
+        self.parent[node] = parent
+        self.first_child[node] = NO_NODE
+        self.next_sibling[node] = NO_NODE
+        self.moves_start[node] = NOT_ORDERED
+        self.moves_count[node] = 0
+        self.moves_taken[node] = 0
+        self.move[node] = move
+        self.color_to_move[node] = color
+
+    def children(self, node: int) -> List[int]:
+        child = int(self.first_child[node])
+        children: List[int] = []
+        while child != NO_NODE:
+            children.append(child)
+            child = int(self.next_sibling[child])
+        return children
+
+    def expand(self, node: int, position: Position) -> int:
+        """
+        Adds the next child of node if its visits allow one more under
+        progressive widening, returning it, or NO_NODE otherwise (also when
+        the block is full)
+        """
+        with _STRIPE_LOCKS[node % LOCK_STRIPES]:
+            if self.moves_start[node] == NOT_ORDERED:
+                moves = ordered_moves(position)
+                with _ALLOCATION_LOCK[0]:
+                    start = int(self.header[ARENA_USED])
+                    if start + len(moves) > len(self.arena):
+                        return NO_NODE
+                    self.header[ARENA_USED] = start + len(moves)
+                self.arena[start:start + len(moves)] = moves
+                self.moves_count[node] = len(moves)
+                self.moves_start[node] = start
+            taken = int(self.moves_taken[node])
+            limit = max(1, int(WIDENING_K * float(self.visits[node]) ** WIDENING_ALPHA))
+            if taken == self.moves_count[node] or taken >= limit:
+                return NO_NODE
+            with _ALLOCATION_LOCK[0]:
+                child = int(self.header[SIZE])
+                if child == self.capacity:
+                    return NO_NODE
+                self.header[SIZE] = child + 1
+            move = int(self.arena[self.moves_start[node] + self.moves_count[node] - 1 - taken])
+            self._init_node(child, node, move, 1 - int(self.color_to_move[node]))
+            # Publish the child only once it is complete
+            self.next_sibling[child] = self.first_child[node]
+            self.first_child[node] = child
+            self.moves_taken[node] = taken + 1
+            return child
+
+    def select(self, node: int) -> int:
+        """
+        The child of node with the highest upper confidence bound, counting
+        virtual losses as lost visits
+        """
+        children = self.children(node)
+        visits = self.visits[children] + self.virtual[children]
+        if (visits == 0).any():
+            return children[int(np.argmin(visits))]
+        parent_visits = int(self.visits[node]) + int(self.virtual[node])
+        scores = self.wins[children] / visits \
+            + C_FACTOR * np.sqrt(np.log10(parent_visits) / visits)
+        return children[int(np.argmax(scores))]
+
+    def add_virtual_loss(self, node: int) -> None:
+        with _STRIPE_LOCKS[node % LOCK_STRIPES]:
+            self.virtual[node] += VIRTUAL_LOSS
+
+    def backpropagate(self, path: List[int], red_value: float) -> None:
+        """
+        Counts a visit along the path from the root, crediting each node with
+        the result (the chance red wins) for the player who moved into it,
+        and takes back the path's virtual losses
+        """
+        for node in path:
+            # The mover into node is the one not to move at node
+            value = red_value if self.color_to_move[node] else 1 - red_value
+            with _STRIPE_LOCKS[node % LOCK_STRIPES]:
+                self.visits[node] += 1
+                self.virtual[node] -= VIRTUAL_LOSS
+                self.wins[node] += value
+
+    def most_visited(self, node: int) -> int:
+        children = self.children(node)
+        return children[int(np.argmax(self.visits[children]))]
+
+def _iterate(tree: SharedTree, position: Position) -> None:
+    """
+    One iteration from the root (node 0), with position set to the root's
+    board
+    """
+    node = 0
+    path = [node]
+    tree.add_virtual_loss(node)
+    while not position.game_over():
+        child = tree.expand(node, position)
+        if child == NO_NODE:
+            if tree.first_child[node] == NO_NODE:
+                break
+            child = tree.select(node)
+        position.make(int(tree.move[child]))
+        tree.add_virtual_loss(child)
+        path.append(child)
+        node = child
+        if tree.visits[child] == 0:
+            # A new leaf: play it out
+            break
+
+    game_state = get_game_state(position)
+    if game_state == GameState.PLAYING:
+        game_state = do_playout(position)
+    if game_state == GameState.PLAYING:
+        cells = np.frombuffer(position.key(), dtype=np.int8).reshape(1, -1)
+        red_value = float(leaf_values(cells)[0])
+    else:
+        red_value = game_value(game_state)
+    tree.backpropagate(path, red_value)
+
+def _grow_shared(block_name: str, capacity: int, board_dict: BoardDict,
+                 color: PlayerColor, turn: int, seed: int, budget: float):
+    """
+    Worker side: grows the shared tree for budget CPU seconds. Returns
+    (iterations, cpu_seconds).
+    """
+    start = process_time()
+    mcts._rng.seed(seed)
+    tree = SharedTree(attach(block_name).buf, capacity)
+    root = Position()
+    root.load(board_dict, color, turn)
+    position = Position()
+    iterations = 0
+    while process_time() - start < budget:
+        position.copy_from(root)
+        _iterate(tree, position)
+        iterations += 1
+    return iterations, process_time() - start
+
+class TreeParallelMcts(WorkerPool):
+    """
+    A process pool whose workers all search one shared tree
+    """
+    def __init__(self, processes: int, capacity: int = SHARED_CAPACITY) -> None:
+        super().__init__(processes, SharedTree.nbytes(capacity))
+        self.capacity = capacity
+        self.tree = SharedTree(self._block.buf, capacity)
+        context = get_context("fork")
+        _STRIPE_LOCKS[:] = [context.Lock() for _ in range(LOCK_STRIPES)]
+        _ALLOCATION_LOCK[:] = [context.Lock()]
+        self._seeds = Random()
+
+    def search(self, board_dict: BoardDict, color: PlayerColor, turn: int,
+               budget: float) -> Action:
+        """
+        Searches the board for color to move, spending about budget CPU
+        seconds across all the workers
+        """
+        self.tree.reset(color)
+        futures = [
+            self._submit(_grow_shared, self._block.name, self.capacity,
+                         board_dict, color, turn,
+                         self._seeds.getrandbits(64), budget / self.processes)
+            for _ in range(self.processes)
+        ]
+        self._finish(futures)
+        return decode_move(int(self.tree.move[self.tree.most_visited(0)]))
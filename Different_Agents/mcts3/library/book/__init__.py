@@ -0,0 +1,4 @@
+from .opening import BOOK_PATH, BOOK_TURNS, BOOK_GAMES, BOOK_SEARCH_SECONDS, BookError, OpeningBook, \
+    position_key, \
+    write_book, \
+    build_book
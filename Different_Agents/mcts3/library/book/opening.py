@@ -0,0 +1,135 @@
+"""
+Opening book. A position is turned so the side to move owns the positive
+stacks, reduced to its canonical frame under the board's symmetries and
+keyed by a 64-bit hash of that frame, so every rotation, mirror image,
+shift and colour swap of a position shares one entry.
+
+The book file is a header followed by fixed-size records sorted by key.
+Opening it maps the file and reads the header only; a lookup is a binary
+search over the mapped records.
+
+Each agent builds its own book from its own search: mcts3 with
+`python -m mcts3.board book`, which asks a fresh mcts3 search for every
+move, and minmaxAgentPrunedUpdatedSpawn with
+`python -m minmaxAgentPrunedUpdatedSpawn`.
+"""
+import mmap
+import os
+import struct
+from collections import Counter, defaultdict
+from hashlib import blake2b
+from functools import partial
+from typing import Callable, Dict, Final, Optional, Tuple
+
+import numpy as np
+from referee.game import Action, PlayerColor
+from ..geometry import MOVE_SYMMETRIES, INVERSE_MOVE_SYMMETRIES, \
+    canonical_board, decode_move, encode_move
+from ..position import Position
+
+BOOK_PATH: Final[str] = os.path.join(os.path.dirname(__file__), "opening.book")
+# Turns of both players, from the start of the game, the book is built for
+BOOK_TURNS: Final[int] = 12
+MAGIC: Final[bytes] = b"INFXBOOK"
+VERSION: Final[int] = 1
+# Magic, version, number of records, turns covered, then padding to 8 bytes
+HEADER: Final[struct.Struct] = struct.Struct("<8sIII4x")
+RECORD: Final[np.dtype] = np.dtype([
+    ("key", "<u8"), ("move", "<i2"), ("weight", "<u2"), ("padding", "<u4")
+])
+MAX_WEIGHT: Final[int] = 0xFFFF
+BOOK_GAMES: Final[int] = 16
+# CPU time the default chooser searches each book move for
+BOOK_SEARCH_SECONDS: Final[float] = 10.0
+
+# Picks a move for the side to move of a board dict of (r, q) -> ('r'/'b', power)
+Chooser = Callable[[dict, PlayerColor, int], Action]
+
+class BookError(Exception):
+    """
+    Raised for files that are not opening books of this version
+    """
+
+def position_key(position: Position) -> Tuple[int, int]:
+    """
+    The book key of a position, and the symmetry taking it to the canonical
+    frame that moves in the book are stored in
+    """
+    oriented = np.frombuffer(position.key(), dtype=np.int8) * np.int8(position.color)
+    canonical, symmetry = canonical_board(oriented)
+    key = int.from_bytes(blake2b(canonical, digest_size=8).digest(), "little")
+    return key, symmetry
+
+class OpeningBook:
+    """
+    Read-only view of a book file. An agent without a book file gets an
+    empty book.
+    """
+    def __init__(self, path: str = BOOK_PATH) -> None:
+        self.turns: int = 0
+        self._records: Optional[np.ndarray] = None
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, entries, turns = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != VERSION:
+            raise BookError(f"{path} is not a version {VERSION} opening book")
+        self.turns = turns
+        self._records = np.frombuffer(mapped, dtype=RECORD, count=entries, offset=HEADER.size)
+
+    def lookup(self, board, color: PlayerColor, turn: int) -> Optional[Action]:
+        """
+        The book move for color to play on a board dict (colours either
+        'r'/'b' or PlayerColor), or None when the position is not in the book
+        """
+        if self._records is None or turn >= self.turns:
+            return None
+        position = Position()
+        position.load(board, color, turn)
+        key, symmetry = position_key(position)
+        keys = self._records["key"]
+        index = int(np.searchsorted(keys, key))
+        if index == len(keys) or keys[index] != key:
+            return None
+        move = int(INVERSE_MOVE_SYMMETRIES[symmetry, self._records["move"][index]])
+        if move not in position.legal_moves():
+            # A hash collision with a different position
+            return None
+        return decode_move(move)
+
+def write_book(moves: Dict[int, Counter], turns: int, path: str = BOOK_PATH) -> None:
+    """
+    Writes a book holding, for every key, its most frequent canonical move
+    """
+    records = np.zeros(len(moves), dtype=RECORD)
+    for i, (key, counts) in enumerate(sorted(moves.items())):
+        move, weight = counts.most_common(1)[0]
+        records[i] = (key, move, min(weight, MAX_WEIGHT), 0)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(records), turns))
+        file.write(records.tobytes())
+
+def build_book(choose: Optional[Chooser] = None, games: int = BOOK_GAMES,
+               turns: int = BOOK_TURNS, path: str = BOOK_PATH) -> None:
+    """
+    Plays games of self-play from the empty board for the first turns turns,
+    asking choose for every move, and writes the moves it picked. choose is
+    meant to be a slow, deep search: it is only ever run offline. By default
+    it is an mcts3 search of BOOK_SEARCH_SECONDS a move, whose random
+    playouts make the games differ.
+    """
+    if choose is None:
+        # Imported here as the minimax agents load this package without mcts3
+        from mcts3.board import search_action
+        choose = partial(search_action, seconds=BOOK_SEARCH_SECONDS)
+    moves: Dict[int, Counter] = defaultdict(Counter)
+    for _ in range(games):
+        position = Position()
+        position.load({}, PlayerColor.RED)
+        while position.turn < turns and not position.game_over():
+            move = encode_move(choose(position.board_dict(), position.player, position.turn))
+            key, symmetry = position_key(position)
+            moves[key][int(MOVE_SYMMETRIES[symmetry, move])] += 1
+            position.make(move)
+    write_book(moves, turns, path)
@@ -0,0 +1,24 @@
+from .tables import NUM_CELLS, NUM_DIRECTIONS, UNREACHABLE, \
+    DIRECTIONS, \
+    cell_index, \
+    cell_coordinates, \
+    NEIGHBOURS, \
+    SPREAD_TARGETS, \
+    SAME_LINE, \
+    LINE_DISTANCE, \
+    DIRECTION_BETWEEN
+from .moves import NUM_MOVES, \
+    spawn_id, \
+    spread_id, \
+    is_spawn, \
+    move_cell, \
+    move_direction, \
+    encode_move, \
+    decode_move
+from .symmetry import NUM_SYMMETRIES, \
+    CELL_SYMMETRIES, \
+    DIRECTION_SYMMETRIES, \
+    CELL_SOURCES, \
+    MOVE_SYMMETRIES, \
+    INVERSE_MOVE_SYMMETRIES, \
+    canonical_board
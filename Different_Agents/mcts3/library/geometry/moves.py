@@ -0,0 +1,49 @@
+"""
+Compact integer ids for every move in the game: a spawn on cell c is c, and a
+spread from cell c in direction d is NUM_CELLS + c * NUM_DIRECTIONS + d.
+"""
+from typing import Final
+
+from referee.game import Action, SpawnAction, SpreadAction, HexPos
+from .tables import NUM_CELLS, NUM_DIRECTIONS, DIRECTIONS, cell_index, cell_coordinates
+
+NUM_MOVES: Final[int] = NUM_CELLS + NUM_CELLS * NUM_DIRECTIONS
+
+_DIRECTION_IDS = {direction: d for d, direction in enumerate(DIRECTIONS)}
+
+def spawn_id(cell: int) -> int:
+    return cell
+
+def spread_id(cell: int, direction_id: int) -> int:
+    return NUM_CELLS + cell * NUM_DIRECTIONS + direction_id
+
+def is_spawn(move_id: int) -> bool:
+    return move_id < NUM_CELLS
+
+def move_cell(move_id: int) -> int:
+    """
+    The cell a move spawns on or spreads from
+    """
+    if move_id < NUM_CELLS:
+        return move_id
+    return (move_id - NUM_CELLS) // NUM_DIRECTIONS
+
+def move_direction(move_id: int) -> int:
+    """
+    The direction id of a spread move
+    """
+    return (move_id - NUM_CELLS) % NUM_DIRECTIONS
+
+def encode_move(action: Action) -> int:
+    match action:
+        case SpawnAction(cell):
+            return spawn_id(cell_index(int(cell.r), int(cell.q)))
+        case SpreadAction(cell, direction):
+            return spread_id(cell_index(int(cell.r), int(cell.q)), _DIRECTION_IDS[direction])
+    raise ValueError(f"Unknown action {action}")
+
+def decode_move(move_id: int) -> Action:
+    r, q = cell_coordinates(move_cell(move_id))
+    if is_spawn(move_id):
+        return SpawnAction(HexPos(r, q))
+    return SpreadAction(HexPos(r, q), DIRECTIONS[move_direction(move_id)])
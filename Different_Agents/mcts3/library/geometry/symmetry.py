@@ -0,0 +1,78 @@
+"""
+Symmetries of the 7x7 hex torus. A position can be rotated by any multiple
+of 60 degrees, mirrored, and shifted by any (r, q) with wrap-around without
+changing the game, giving 12 * 49 symmetries. Each is tabulated as a
+permutation of cells, of directions and of move ids, so boards and moves can
+be moved to a canonical frame and back with fancy indexing.
+"""
+from typing import Final, List, Tuple
+
+import numpy as np
+from referee.game.constants import BOARD_N
+from .tables import NUM_CELLS, NUM_DIRECTIONS, DIRECTIONS
+from .moves import NUM_MOVES
+
+# (r, q) -> (-q, r + q) turns every direction into the next one, and
+# (r, q) -> (q, r) mirrors the board onto itself
+_ROTATION = np.array([[0, -1], [1, 1]])
+_REFLECTION = np.array([[0, 1], [1, 0]])
+
+def _linear_maps() -> List[np.ndarray]:
+    maps = []
+    matrix = np.eye(2, dtype=int)
+    for _ in range(NUM_DIRECTIONS):
+        maps.append(matrix)
+        maps.append(matrix @ _REFLECTION)
+        matrix = _ROTATION @ matrix
+    return maps
+
+def _build_symmetries() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    CELL_SYMMETRIES[s, c] and DIRECTION_SYMMETRIES[s, d]: where symmetry s
+    sends cell c and direction d
+    """
+    directions = np.array([(d.r, d.q) for d in DIRECTIONS])
+    direction_ids = {(int(r), int(q)): d for d, (r, q) in enumerate(directions)}
+    coordinates = np.array(np.divmod(np.arange(NUM_CELLS), BOARD_N)).T
+    cells, dirs = [], []
+    for matrix in _linear_maps():
+        mapped_dirs = [direction_ids[tuple(int(x) for x in matrix @ d)] for d in directions]
+        mapped = coordinates @ matrix.T
+        for shift in range(NUM_CELLS):
+            shifted = (mapped + np.divmod(shift, BOARD_N)) % BOARD_N
+            cells.append(shifted[:, 0] * BOARD_N + shifted[:, 1])
+            dirs.append(mapped_dirs)
+    return np.array(cells, dtype=np.int8), np.array(dirs, dtype=np.int8)
+
+def _build_move_symmetries() -> np.ndarray:
+    """
+    MOVE_SYMMETRIES[s, m]: the id of move m once symmetry s is applied
+    """
+    spawns = CELL_SYMMETRIES.astype(np.int16)
+    spreads = NUM_CELLS + spawns[:, :, None] * NUM_DIRECTIONS \
+        + DIRECTION_SYMMETRIES[:, None, :].astype(np.int16)
+    return np.concatenate(
+        [spawns, spreads.reshape(len(spawns), NUM_CELLS * NUM_DIRECTIONS)], axis=1)
+
+CELL_SYMMETRIES, DIRECTION_SYMMETRIES = _build_symmetries()
+NUM_SYMMETRIES: Final[int] = len(CELL_SYMMETRIES)
+# A board b (one value per cell) under symmetry s is b[CELL_SOURCES[s]]
+CELL_SOURCES: Final[np.ndarray] = np.argsort(CELL_SYMMETRIES, axis=1).astype(np.int8)
+MOVE_SYMMETRIES: Final[np.ndarray] = _build_move_symmetries()
+# Undoes MOVE_SYMMETRIES: INVERSE_MOVE_SYMMETRIES[s, MOVE_SYMMETRIES[s, m]] == m
+INVERSE_MOVE_SYMMETRIES: Final[np.ndarray] = np.argsort(MOVE_SYMMETRIES, axis=1).astype(np.int16)
+assert MOVE_SYMMETRIES.shape == (NUM_SYMMETRIES, NUM_MOVES)
+
+def canonical_board(cells) -> Tuple[bytes, int]:
+    """
+    The lexicographically smallest image of a 49-value signed board under
+    every symmetry, as bytes, with the symmetry that produces it
+    """
+    images = np.frombuffer(bytes(cells), dtype=np.int8)[CELL_SOURCES]
+    # lexsort treats its last key as the primary one
+    symmetry = int(np.lexsort(images.T[::-1])[0])
+    return images[symmetry].tobytes(), symmetry
+
+for _table in (CELL_SYMMETRIES, DIRECTION_SYMMETRIES, CELL_SOURCES,
+               MOVE_SYMMETRIES, INVERSE_MOVE_SYMMETRIES):
+    _table.setflags(write=False)
@@ -0,0 +1,71 @@
+"""
+Precomputed geometry of the 7x7 torus the game is played on. Every cell is
+given a flat index (r * 7 + q) and the relationships between cells that the
+heuristics keep asking for are worked out once, at import time, so that they
+become plain table lookups instead of per-pair arithmetic.
+"""
+from typing import Final, Tuple
+
+import numpy as np
+from referee.game import HexDir
+from referee.game.constants import BOARD_N, MAX_CELL_POWER
+
+NUM_CELLS: Final[int] = BOARD_N * BOARD_N
+NUM_DIRECTIONS: Final[int] = len(HexDir)
+# Larger than any stack power, so "power >= distance" is always False for
+# cells which are not on a common line
+UNREACHABLE: Final[int] = BOARD_N
+
+# Same order as the HexDir enum, so direction ids can index either
+DIRECTIONS: Final[Tuple[HexDir, ...]] = tuple(HexDir)
+
+def cell_index(r: int, q: int) -> int:
+    """
+    Flat index of the cell at (r, q)
+    """
+    return r * BOARD_N + q
+
+def cell_coordinates(index: int) -> Tuple[int, int]:
+    """
+    (r, q) coordinates of the cell with the given flat index
+    """
+    return divmod(index, BOARD_N)
+
+def _build_spread_targets() -> np.ndarray:
+    """
+    SPREAD_TARGETS[cell, d, k] is the cell reached k + 1 steps away from
+    cell in direction d, wrapping around the torus
+    """
+    rows, cols = np.divmod(np.arange(NUM_CELLS), BOARD_N)
+    steps = np.arange(1, MAX_CELL_POWER + 1)
+    dir_r = np.array([d.r for d in DIRECTIONS])
+    dir_q = np.array([d.q for d in DIRECTIONS])
+    target_r = (rows[:, None, None] + dir_r[None, :, None] * steps) % BOARD_N
+    target_q = (cols[:, None, None] + dir_q[None, :, None] * steps) % BOARD_N
+    return (target_r * BOARD_N + target_q).astype(np.int8)
+
+def _build_line_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shortest straight-line (spread) distance and the direction achieving it
+    between every pair of cells
+    """
+    distance = np.full((NUM_CELLS, NUM_CELLS), UNREACHABLE, dtype=np.int8)
+    direction = np.full((NUM_CELLS, NUM_CELLS), -1, dtype=np.int8)
+    np.fill_diagonal(distance, 0)
+    cells = np.arange(NUM_CELLS)
+    # Walk outwards one step at a time so the first hit is the shortest
+    for step in range(MAX_CELL_POWER):
+        for d in range(NUM_DIRECTIONS):
+            targets = SPREAD_TARGETS[:, d, step]
+            unset = distance[cells, targets] > step + 1
+            distance[cells[unset], targets[unset]] = step + 1
+            direction[cells[unset], targets[unset]] = d
+    return distance, direction
+
+SPREAD_TARGETS: Final[np.ndarray] = _build_spread_targets()
+NEIGHBOURS: Final[np.ndarray] = np.ascontiguousarray(SPREAD_TARGETS[:, :, 0])
+LINE_DISTANCE, DIRECTION_BETWEEN = _build_line_tables()
+SAME_LINE: Final[np.ndarray] = LINE_DISTANCE < UNREACHABLE
+
+for _table in (SPREAD_TARGETS, NEIGHBOURS, LINE_DISTANCE, DIRECTION_BETWEEN, SAME_LINE):
+    _table.setflags(write=False)
@@ -2,4 +2,15 @@ from .heuristic import surround_heuristic, \
     token_difference_heuristic, \
     power_difference_heuristic, \
     power_within_reach_heuristic, \
-    minimum_move_estimation
\ No newline at end of file
+    minimum_move_estimation
+from .batched import encode_board, \
+    encode_boards, \
+    successor_positions, \
+    power_difference_batch, \
+    token_difference_batch, \
+    surround_batch, \
+    power_within_reach_batch, \
+    minimum_move_estimation_batch
+from .move_delta import MoveScore, \
+    spread_delta, \
+    score_moves
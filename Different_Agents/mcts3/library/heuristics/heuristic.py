@@ -1,7 +1,8 @@
 from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
 import numpy as np
-import math
+from ..geometry import cell_index, cell_coordinates, NEIGHBOURS, \
+    LINE_DISTANCE, SAME_LINE
 DIRECTIONS = (HexDir.DownRight, HexDir.Down, HexDir.DownLeft, HexDir.UpLeft, HexDir.Up, HexDir.UpRight)
 
 def surround_heuristic(red_tokens, blue_tokens, player_color):
@@ -14,8 +15,8 @@ def surround_heuristic(red_tokens, blue_tokens, player_color):
     
     surround_value = 0
     for k, v in blue_tokens.items():
-        for direction in DIRECTIONS:
-            neighbouring_pos = tuple((np.array(k) + np.array((direction.r, direction.q))) % 7)            
+        for neighbour in NEIGHBOURS[cell_index(*k)].tolist():
+            neighbouring_pos = cell_coordinates(neighbour)
             if neighbouring_pos in red_tokens:
                 if red_tokens[neighbouring_pos][1] >= 2:
                     surround_value += 2
@@ -59,34 +60,13 @@ def get_straight_line_distance(r_x, r_y, b_x, b_y) -> int:
     including the mirroring distances
     ASSUMPTION: blue is a straight line distance away from red and vice versa
     """
-    candidate_value: int = (
-        abs(r_x - b_x) if r_x != b_x
-        else abs(r_y - b_y)
-    )
-
-    if candidate_value >= 4:
-        # we want it to revert
-        return 7 - candidate_value
-    return candidate_value
+    return int(LINE_DISTANCE[cell_index(r_x, r_y), cell_index(b_x, b_y)])
 
 def same_relative_row(x1, y1, x2, y2):
     """
     Check if two coordinates are on the same vertical or diagonal hex line.
     """
-    # If on the same diagonal row
-    if x1 == x2 or y1 == y2:
-        return True
-        # return (x1-x2, y1-y2)
-    
-    # Without considering mod 7, if on same vertical row
-    elif (math.floor((x1 - x2)/6) == -1 and math.ceil((y1 - y2)/6) == 1):
-        return True
-        # return (-1, 1)
-    
-    elif (math.floor((x1 - x2)/6) == 1 and math.ceil((y1 - y2)/6) == -1):
-        return True
-        # return (1, -1)
-    return False
+    return bool(SAME_LINE[cell_index(x1, y1), cell_index(x2, y2)])
 
 
 def power_within_reach_heuristic(red_tokens, blue_tokens, player_color):
@@ -96,14 +76,18 @@ def power_within_reach_heuristic(red_tokens, blue_tokens, player_color):
         red_tokens = blue_tokens
         blue_tokens = intermediate
 
-    within_reach = 0
-    for (b_x, b_y), (b_c, b_v) in blue_tokens.items():
-        for (r_x, r_y), (r_c, r_v) in red_tokens.items():
-            if same_relative_row(r_x, r_y, b_x, b_y):
-                if r_v >= get_straight_line_distance(r_x, r_y, b_x, b_y):
-                    within_reach += b_v
-                    break
-    return within_reach
+    if len(red_tokens) == 0 or len(blue_tokens) == 0:
+        return 0
+
+    red_cells = [cell_index(*k) for k in red_tokens]
+    red_powers = np.array([v for (_, v) in red_tokens.values()])
+    blue_cells = [cell_index(*k) for k in blue_tokens]
+    blue_powers = np.array([v for (_, v) in blue_tokens.values()])
+
+    # A blue stack is within reach if any red stack on its line is powerful
+    # enough to spread onto it
+    reachable = LINE_DISTANCE[np.ix_(red_cells, blue_cells)] <= red_powers[:, None]
+    return int(blue_powers[reachable.any(axis=0)].sum())
 
 def minimum_move_estimation(board):
     """
@@ -117,29 +101,28 @@ def minimum_move_estimation(board):
     blue_board = {(b_x, b_y): (b_c, b_v) for (b_x, b_y), (b_c, b_v) in board.items() if b_c == "b"}
     red_board = {(r_x, r_y): (r_c, r_v) for (r_x, r_y), (r_c, r_v) in board.items() if r_c == "r"}
     
-    for (b_x, b_y), (b_c, b_v) in blue_board.items():
-        blue_taken = False
-        for (r_x, r_y), (r_c, r_v) in red_board.items():
-            # If a blue and red token are on the same straight line and
-            # the red token stack can reach the blue token with one spread
-            # we estimate that it takes 1 move for the blue token to be captured
-            if same_relative_row(r_x, r_y, b_x, b_y):
-                if r_v >= get_straight_line_distance(r_x, r_y, b_x, b_y):
-                    estimate += 1
-                    blue_taken = True
-                    break
-        
-        # If there is no red token on a straight line with a blue token,
-        # It takes a higher estimated 1.5 moves.
-        if not blue_taken:
-            estimate += 1.5
-        
-        # An additional penalty is calculated and subtracted form the estimate
-        # to make the heuristic admissible with respect to most test cases as is possible
-        # that blues on a straight line can be captured in 1 move
-        for (b_x2, b_y2), (b_c2, b_v2) in blue_board.items():
-            if same_relative_row(b_x, b_y, b_x2, b_y2) and (b_x, b_y) != (b_x2, b_y2):
-                estimate -= 0.5
-                break
- 
+    if len(blue_board) == 0:
+        return estimate
+
+    blue_cells = [cell_index(*k) for k in blue_board]
+    red_cells = [cell_index(*k) for k in red_board]
+    red_powers = np.array([v for (_, v) in red_board.values()], dtype=np.int8)
+
+    # If a blue and red token are on the same straight line and
+    # the red token stack can reach the blue token with one spread
+    # we estimate that it takes 1 move for the blue token to be captured.
+    # If there is no red token on a straight line with a blue token,
+    # It takes a higher estimated 1.5 moves.
+    blue_taken = (
+        LINE_DISTANCE[np.ix_(red_cells, blue_cells)] <= red_powers[:, None]
+    ).any(axis=0)
+    estimate += float(np.where(blue_taken, 1, 1.5).sum())
+
+    # An additional penalty is calculated and subtracted form the estimate
+    # to make the heuristic admissible with respect to most test cases as is possible
+    # that blues on a straight line can be captured in 1 move
+    blue_lines = SAME_LINE[np.ix_(blue_cells, blue_cells)]
+    np.fill_diagonal(blue_lines, False)
+    estimate -= 0.5 * int(blue_lines.any(axis=1).sum())
+
     return estimate
\ No newline at end of file
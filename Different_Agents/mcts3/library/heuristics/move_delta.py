@@ -0,0 +1,97 @@
+"""
+Closed-form one-ply move scoring. Instead of applying every move to a copy of
+the board and re-summing it, the change in power and token difference is
+read straight off the cells a spread lands on.
+"""
+from heapq import nlargest
+from random import random
+from typing import List, NamedTuple, Optional
+
+from referee.game import PlayerColor, Action, SpawnAction, SpreadAction, HexPos
+from referee.game.constants import MAX_CELL_POWER, MAX_TOTAL_POWER
+from ..geometry import DIRECTIONS, NUM_CELLS, SPREAD_TARGETS, cell_coordinates
+
+# _SPREAD_CELLS[(r, q)][d] lists the (r, q) cells a full-power spread from
+# (r, q) in direction d lands on, nearest first
+_SPREAD_CELLS = {
+    cell_coordinates(cell): [
+        [cell_coordinates(target) for target in targets]
+        for targets in SPREAD_TARGETS[cell].tolist()
+    ]
+    for cell in range(NUM_CELLS)
+}
+
+class MoveScore(NamedTuple):
+    """
+    Change in (own - enemy) power and token count caused by a move
+    """
+    power_delta: int
+    token_delta: int
+    action: Action
+
+def spread_delta(board, cell, direction_id: int, player_color: PlayerColor):
+    """
+    (power_delta, token_delta) of spreading the stack at cell in the given
+    direction, without applying the move
+    """
+    _, power = board[cell]
+    # The source stack leaves its cell
+    power_delta = -power
+    token_delta = -1
+    for target in _SPREAD_CELLS[cell][direction_id][:power]:
+        if target not in board:
+            power_delta += 1
+            token_delta += 1
+            continue
+        color, value = board[target]
+        if color == player_color:
+            if value == MAX_CELL_POWER:
+                # Overflowing our own stack removes it
+                power_delta -= value
+                token_delta -= 1
+            else:
+                power_delta += 1
+        elif value == MAX_CELL_POWER:
+            power_delta += value
+            token_delta += 1
+        else:
+            # The enemy stack is taken over with one extra token on top
+            power_delta += 2 * value + 1
+            token_delta += 2
+    return power_delta, token_delta
+
+def score_moves(board, player_color: PlayerColor, k: Optional[int] = None) -> List[MoveScore]:
+    """
+    Returns the k best moves (all of them if k is None) for player_color,
+    ordered by power then token difference gain. Ties are broken randomly.
+    """
+    candidates = []
+    if sum(v for (_, v) in board.values()) < MAX_TOTAL_POWER:
+        for cell in _SPREAD_CELLS:
+            if cell not in board:
+                # A spawn always adds one power and one token
+                candidates.append((1, 1, random(), cell, None))
+
+    for cell, (color, _) in board.items():
+        if color != player_color:
+            continue
+        for direction_id in range(len(DIRECTIONS)):
+            power_delta, token_delta = spread_delta(board, cell, direction_id, player_color)
+            candidates.append((power_delta, token_delta, random(), cell, direction_id))
+
+    if k is None:
+        best = sorted(candidates, reverse=True)
+    else:
+        best = nlargest(k, candidates)
+
+    scores: List[MoveScore] = []
+    for power_delta, token_delta, _, (r, q), direction_id in best:
+        # Board keys may hold NumPy integers, the referee expects plain ints
+        cell = HexPos(int(r), int(q))
+        action: Action
+        if direction_id is None:
+            action = SpawnAction(cell)
+        else:
+            action = SpreadAction(cell, DIRECTIONS[direction_id])
+        scores.append(MoveScore(power_delta, token_delta, action))
+    return scores
@@ -0,0 +1,2 @@
+from .position import RED, BLUE, SPREAD_LINES, Position
+from .bitboard import FULL_MASK, MOVE_ACTIONS, Bitboard, cells, neighbours, shift
@@ -0,0 +1,194 @@
+"""
+A mutable position for search. The board is 49 signed powers indexed by
+geometry.cell_index (red positive, blue negative, empty zero), kept in an
+array('b') with running power and token totals. make() plays a move id in
+place and pushes what it overwrote; unmake() pops it back, so walking a
+search tree never copies the board.
+"""
+from array import array
+from typing import Final, List, Tuple
+
+from referee.game import PlayerColor
+from referee.game.constants import MAX_CELL_POWER, MAX_TOTAL_POWER, MAX_TURNS
+from ..geometry import NUM_CELLS, NUM_DIRECTIONS, SPREAD_TARGETS
+
+RED: Final[int] = 1
+BLUE: Final[int] = -1
+
+# SPREAD_LINES[cell][d] is the tuple of cells a spread from cell in direction
+# d reaches, nearest first
+SPREAD_LINES: Final[Tuple[Tuple[Tuple[int, ...], ...], ...]] = tuple(
+    tuple(tuple(line) for line in cell) for cell in SPREAD_TARGETS.tolist()
+)
+_RED_VALUES = {'r', PlayerColor.RED}
+
+class Position:
+    """
+    Board, side to move and turn number of a game in progress
+    """
+    __slots__ = ("cells", "color", "turn", "red_power", "blue_power",
+                 "red_tokens", "blue_tokens", "history", "_undo", "_frames")
+
+    def __init__(self) -> None:
+        self.cells = array('b', bytes(NUM_CELLS))
+        # RED (+1) or BLUE (-1), the sign of the side to move's stacks
+        self.color: int = RED
+        self.turn: int = 0
+        self.red_power: int = 0
+        self.blue_power: int = 0
+        self.red_tokens: int = 0
+        self.blue_tokens: int = 0
+        # Move ids made since the position was last loaded
+        self.history: List[int] = []
+        # Flat (cell, old value) pairs, and where each move's pairs start
+        self._undo: List[int] = []
+        self._frames: List[int] = []
+
+    def load(self, board, color: PlayerColor, turn: int = 0) -> None:
+        """
+        Resets the position in place to a board dict (colours either 'r'/'b'
+        or PlayerColor)
+        """
+        cells = self.cells
+        for cell in range(NUM_CELLS):
+            cells[cell] = 0
+        for (r, q), (c, v) in board.items():
+            cells[r * 7 + q] = v if c in _RED_VALUES else -v
+        self.color = int(color)
+        self.turn = turn
+        self.history.clear()
+        self._undo.clear()
+        self._frames.clear()
+        self._recount()
+
+    def copy_from(self, other: 'Position') -> None:
+        """
+        Resets the position in place to another one, without its history
+        """
+        self.cells[:] = other.cells
+        self.color = other.color
+        self.turn = other.turn
+        self.red_power, self.blue_power = other.red_power, other.blue_power
+        self.red_tokens, self.blue_tokens = other.red_tokens, other.blue_tokens
+        self.history.clear()
+        self._undo.clear()
+        self._frames.clear()
+
+    def _recount(self) -> None:
+        self.red_power = self.blue_power = 0
+        self.red_tokens = self.blue_tokens = 0
+        for value in self.cells:
+            if value > 0:
+                self.red_power += value
+                self.red_tokens += 1
+            elif value < 0:
+                self.blue_power -= value
+                self.blue_tokens += 1
+
+    def _set(self, cell: int, value: int) -> None:
+        """
+        Overwrites a cell, keeping the totals up to date
+        """
+        old = self.cells[cell]
+        if old > 0:
+            self.red_power -= old
+            self.red_tokens -= 1
+        elif old < 0:
+            self.blue_power += old
+            self.blue_tokens -= 1
+        if value > 0:
+            self.red_power += value
+            self.red_tokens += 1
+        elif value < 0:
+            self.blue_power -= value
+            self.blue_tokens += 1
+        self.cells[cell] = value
+
+    @property
+    def player(self) -> PlayerColor:
+        return PlayerColor.RED if self.color == RED else PlayerColor.BLUE
+
+    @property
+    def ply(self) -> int:
+        """
+        Number of moves made since the position was last loaded
+        """
+        return len(self.history)
+
+    def key(self) -> bytes:
+        """
+        The 49-byte key of the board, one signed power per cell
+        """
+        return self.cells.tobytes()
+
+    def board_dict(self):
+        """
+        The board as a dict of (r, q) -> ('r'/'b', power)
+        """
+        return {
+            divmod(cell, 7): ('r' if value > 0 else 'b', abs(value))
+            for cell, value in enumerate(self.cells) if value != 0
+        }
+
+    def game_over(self) -> bool:
+        if self.turn < 2:
+            return False
+        return self.turn >= MAX_TURNS or self.red_power == 0 or self.blue_power == 0
+
+    def legal_moves(self) -> List[int]:
+        """
+        Ids of every move open to the side to move
+        """
+        moves: List[int] = []
+        cells = self.cells
+        color = self.color
+        can_spawn = self.red_power + self.blue_power < MAX_TOTAL_POWER
+        for cell in range(NUM_CELLS):
+            value = cells[cell]
+            if value == 0:
+                if can_spawn:
+                    moves.append(cell)
+            elif (value > 0) == (color > 0):
+                first = NUM_CELLS + cell * NUM_DIRECTIONS
+                moves.extend(range(first, first + NUM_DIRECTIONS))
+        return moves
+
+    def make(self, move: int) -> None:
+        """
+        Plays a move id for the side to move
+        """
+        undo = self._undo
+        color = self.color
+        self._frames.append(len(undo))
+        self.history.append(move)
+        if move < NUM_CELLS:
+            undo.extend((move, self.cells[move]))
+            self._set(move, color)
+        else:
+            cell, direction = divmod(move - NUM_CELLS, NUM_DIRECTIONS)
+            power = abs(self.cells[cell])
+            undo.extend((cell, self.cells[cell]))
+            for target in SPREAD_LINES[cell][direction][:power]:
+                old = self.cells[target]
+                undo.extend((target, old))
+                # Stacks at full power are removed when they gain a token
+                if abs(old) == MAX_CELL_POWER:
+                    self._set(target, 0)
+                else:
+                    self._set(target, color * (abs(old) + 1))
+            self._set(cell, 0)
+        self.color = -color
+        self.turn += 1
+
+    def unmake(self) -> None:
+        """
+        Takes back the last move made
+        """
+        undo = self._undo
+        start = self._frames.pop()
+        self.history.pop()
+        while len(undo) > start:
+            old = undo.pop()
+            self._set(undo.pop(), old)
+        self.color = -self.color
+        self.turn -= 1
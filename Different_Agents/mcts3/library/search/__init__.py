@@ -0,0 +1,16 @@
+from .shared import SearchCancelled, \
+    CpuLedger, \
+    WorkerPool, \
+    attach, \
+    closable_stdin, \
+    start_workers
+from .zobrist import ZOBRIST, SIDE_TO_MOVE, board_hash
+from .transposition import EXACT, LOWER, UPPER, TableEntry, TranspositionTable
+from .root_parallel import RootParallelPool
+from .lazy_smp import LazySmpPool
+from .proof_number import PROVEN, DISPROVEN, UNKNOWN, DFPN_MOVES, DFPN_NODES, DFPN_STACKS, \
+    ProofNumberSearch, \
+    forced_elimination
+from .conversion import CONVERSION_MARGIN, CONVERSION_DEPTH, CONVERSION_NODES, \
+    ConversionSearch, \
+    conversion_action
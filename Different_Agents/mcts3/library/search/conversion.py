@@ -0,0 +1,180 @@
+"""
+Conversion of won games. Once a side is far ahead in power, a full-width
+search mostly compares ways of winning, and lets a won game drag on towards
+MAX_TURNS. Conversion mode only looks at moves that take enemy power or
+stacks, and plays the one that finishes the game soonest.
+
+Every such move is rated by how many more capturing moves it would take to
+clear the board if the opponent stood still, found by iterative deepening
+over capturing moves only, most damaging first, within a small node budget.
+A move is only played if no reply can bring the opponent back within
+WIN_POWER_DIFF of us, so giving up the full search never gives up the win.
+"""
+from typing import Final, List, Optional, Tuple
+
+from referee.game import Action, PlayerColor
+from referee.game.constants import WIN_POWER_DIFF
+from ..geometry import NUM_CELLS, decode_move
+from ..position import RED, Position
+
+# Power lead over the opponent above which a game counts as won, as for
+# minmaxAgentOrder's greedy switch
+CONVERSION_MARGIN: Final[int] = 15
+# Capturing moves, after the first, looked ahead for the shortest win
+CONVERSION_DEPTH: Final[int] = 3
+CONVERSION_NODES: Final[int] = 2000
+# Distance of a move whose win is further away than the search looks
+UNREACHED: Final[int] = 1 << 30
+
+class _BudgetExhausted(Exception):
+    """
+    Raised once a search has made all the moves it may
+    """
+
+def _enemy(position: Position, color: int) -> Tuple[int, int]:
+    """
+    (stacks, power) of color's opponent
+    """
+    if color == RED:
+        return position.blue_tokens, position.blue_power
+    return position.red_tokens, position.red_power
+
+def _margin(position: Position, color: int) -> int:
+    """
+    Power lead of color over its opponent
+    """
+    return (position.red_power - position.blue_power) * color
+
+class ConversionSearch:
+    """
+    Shortest-win search over capturing moves, for the side to move of the
+    position it is given
+    """
+    def __init__(self, max_nodes: int = CONVERSION_NODES, depth: int = CONVERSION_DEPTH) -> None:
+        self.max_nodes = max_nodes
+        self.depth = depth
+        self.nodes: int = 0
+
+    def _make(self, position: Position, move: int) -> None:
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _BudgetExhausted
+        position.make(move)
+
+    def captures(self, position: Position) -> List[int]:
+        """
+        Moves of the side to move that leave the opponent fewer stacks or
+        less power, those leaving the fewest stacks, then least power, first
+        """
+        color = position.color
+        before = _enemy(position, color)
+        scored = []
+        for move in position.legal_moves():
+            if move < NUM_CELLS:
+                # Spawns never touch enemy stacks
+                continue
+            self._make(position, move)
+            after = _enemy(position, color)
+            position.unmake()
+            if after[0] < before[0] or after[1] < before[1]:
+                scored.append((after, move))
+        scored.sort()
+        return [move for _, move in scored]
+
+    def _clears_within(self, position: Position, moves: int) -> bool:
+        """
+        Whether the side to move can take every enemy stack in moves
+        capturing moves of its own while the opponent passes
+        """
+        color = position.color
+        for move in self.captures(position):
+            self._make(position, move)
+            # Pass the opponent's turn
+            position.color = color
+            try:
+                if _enemy(position, color)[0] == 0:
+                    won = _margin(position, color) >= WIN_POWER_DIFF
+                else:
+                    won = moves > 1 and self._clears_within(position, moves - 1)
+            finally:
+                position.color = -color
+                position.unmake()
+            if won:
+                return True
+        return False
+
+    def distance(self, position: Position) -> int:
+        """
+        The fewest capturing moves the side to move needs to clear the board
+        if unopposed, by iterative deepening, or UNREACHED
+        """
+        for moves in range(1, self.depth + 1):
+            if self._clears_within(position, moves):
+                return moves
+        return UNREACHED
+
+    def safe(self, position: Position, color: int) -> bool:
+        """
+        Whether color, having just moved, stays a winner after any reply of
+        the side to move. Only spreads can cut into color's lead by more than
+        the one power a spawn adds.
+        """
+        if _margin(position, color) - 1 < WIN_POWER_DIFF:
+            return False
+        for move in position.legal_moves():
+            if move < NUM_CELLS:
+                continue
+            self._make(position, move)
+            margin = _margin(position, color)
+            position.unmake()
+            if margin < WIN_POWER_DIFF:
+                return False
+        return True
+
+    def search(self, position: Position) -> Optional[int]:
+        """
+        The safe capturing move with the shortest win, or None if there is
+        none. Runs out its budget on the moves it has rated by then.
+        """
+        color = position.color
+        best: Optional[Tuple[int, int]] = None
+        self.nodes = 0
+        try:
+            for move in self.captures(position):
+                self._make(position, move)
+                try:
+                    if _enemy(position, color)[0] == 0:
+                        if _margin(position, color) >= WIN_POWER_DIFF:
+                            return move
+                        continue
+                    if not self.safe(position, color):
+                        continue
+                    # The opponent's move is skipped, as the distance assumes
+                    position.color = color
+                    try:
+                        distance = 1 + self.distance(position)
+                    finally:
+                        position.color = -color
+                finally:
+                    position.unmake()
+                if best is None or distance < best[0]:
+                    best = (distance, move)
+        except _BudgetExhausted:
+            pass
+        return None if best is None else best[1]
+
+def conversion_action(board, color: PlayerColor, turn: int,
+                      max_nodes: int = CONVERSION_NODES) -> Optional[Action]:
+    """
+    The conversion move for color on a board dict (colours either 'r'/'b' or
+    PlayerColor), or None if color is not CONVERSION_MARGIN power ahead or
+    has no safe capture, leaving the move to the full search
+    """
+    if turn < 2:
+        return None
+    position = Position()
+    position.load(board, color, turn)
+    if _margin(position, position.color) <= CONVERSION_MARGIN:
+        return None
+    move = ConversionSearch(max_nodes).search(position)
+    return None if move is None else decode_move(move)
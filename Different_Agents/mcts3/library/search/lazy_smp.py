@@ -0,0 +1,173 @@
+"""
+Lazy-SMP parallel search. Every worker process runs the same iterative
+deepening alpha-beta over the agent's own move generation and evaluation,
+with a slightly different depth and move-ordering noise. The workers never
+talk to each other directly; they only share a lock-free transposition table
+in shared memory, so cutoffs found by one worker speed up the others.
+
+The agent has to provide:
+    children(node, isMaximizingPlayer) -> iterable of (move, child board)
+    evaluate(node) -> static value from the agent's point of view
+    game_over(node, turn), plus the _turn attribute
+"""
+import math
+import random
+from time import process_time
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from ..geometry import encode_move
+from .shared import SearchCancelled, WorkerPool, attach
+from .transposition import ENTRY_BYTES, EXACT, LOWER, UPPER, TranspositionTable
+from .zobrist import SIDE_TO_MOVE, board_hash
+
+HEADER_BYTES = 8
+# Chance a helper swaps two neighbouring moves in its ordering
+ORDERING_NOISE = 0.15
+
+class _Searcher:
+    """
+    Alpha-beta with transposition table, run inside one worker process
+    """
+    def __init__(self, agent, table: TranspositionTable, header: np.ndarray,
+                 generation: int, noise: float) -> None:
+        self.agent = agent
+        self.table = table
+        self.header = header
+        self.generation = generation
+        self.noise = noise
+
+    def ordered_children(self, node, maximizing: bool, tt_move: Optional[int]):
+        children = [
+            (encode_move(move), move, child)
+            for move, child in self.agent.children(node, maximizing)
+        ]
+        for i in range(len(children) - 1):
+            if random.random() < self.noise:
+                children[i], children[i + 1] = children[i + 1], children[i]
+        if tt_move is not None:
+            # Best move from an earlier (or another worker's) search first
+            children.sort(key=lambda x: x[0] != tt_move)
+        return children
+
+    def alphabeta(self, node, depth: int, maximizing: bool,
+                  alpha: float, beta: float, ply: int = 0) -> Tuple[float, Any]:
+        """
+        (value, best move) of node searched to depth. Table entries only
+        order the moves at the root (ply 0), which always searches them, so
+        it has a move to return even once another worker stored the root.
+        """
+        if self.header[0] != self.generation:
+            raise SearchCancelled
+
+        agent = self.agent
+        if depth == 0 or agent.game_over(node, agent._turn):
+            return agent.evaluate(node), None
+
+        key = board_hash(node) ^ (0 if maximizing else SIDE_TO_MOVE)
+        entry = self.table.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry.move_id
+            if ply > 0 and entry.depth >= depth:
+                if entry.flag == EXACT:
+                    return entry.value, None
+                if entry.flag == LOWER:
+                    alpha = max(alpha, entry.value)
+                else:
+                    beta = min(beta, entry.value)
+                if alpha >= beta:
+                    return entry.value, None
+
+        children = self.ordered_children(node, maximizing, tt_move)
+        if len(children) == 0:
+            # In rare pruning cases where no moves cause difference in heuristic
+            return agent.evaluate(node), None
+
+        original_alpha, original_beta = alpha, beta
+        best_id, best_move = None, None
+        if maximizing:
+            value = -math.inf
+            for move_id, move, child in children:
+                tmp = self.alphabeta(child, depth - 1, False, alpha, beta, ply + 1)[0]
+                if tmp > value:
+                    value, best_id, best_move = tmp, move_id, move
+                if value >= beta:
+                    break
+                alpha = max(alpha, value)
+        else:
+            value = math.inf
+            for move_id, move, child in children:
+                tmp = self.alphabeta(child, depth - 1, True, alpha, beta, ply + 1)[0]
+                if tmp < value:
+                    value, best_id, best_move = tmp, move_id, move
+                if value <= alpha:
+                    break
+                beta = min(beta, value)
+
+        if value <= original_alpha:
+            flag = UPPER
+        elif value >= original_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, value, depth, flag, best_id)
+        return value, best_move
+
+def _lazy_search(block_name: str, entries: int, generation: int,
+                 worker_id: int, agent, board, depth: int):
+    """
+    Worker side: iterative deepening up to depth (one deeper for every other
+    helper) until done or cancelled. Returns ((value, move), cpu_seconds)
+    with the deepest completed iteration.
+    """
+    start = process_time()
+    block = attach(block_name)
+    header = np.ndarray((1,), dtype=np.int64, buffer=block.buf)
+    table = TranspositionTable(block.buf[HEADER_BYTES:], entries)
+
+    # Helpers shuffle differently from each other and from the main worker
+    random.seed(generation * 1000 + worker_id)
+    noise = 0 if worker_id == 0 else ORDERING_NOISE
+    searcher = _Searcher(agent, table, header, generation, noise)
+
+    result = (-math.inf, None)
+    try:
+        for iteration_depth in range(1, depth + worker_id % 2 + 1):
+            result = searcher.alphabeta(board, iteration_depth, True, -math.inf, math.inf)
+    except SearchCancelled:
+        pass
+    return result, process_time() - start
+
+class LazySmpPool(WorkerPool):
+    """
+    Worker processes sharing one transposition table of `entries` slots
+    """
+    def __init__(self, processes: int, entries: int = 1 << 16) -> None:
+        super().__init__(processes, HEADER_BYTES + entries * ENTRY_BYTES)
+        self.entries = entries
+        self._header = np.ndarray((1,), dtype=np.int64, buffer=self._block.buf)
+        self._header[0] = 0
+        TranspositionTable(self._block.buf[HEADER_BYTES:], entries).clear()
+
+    def search(self, agent, board, depth: int) -> Tuple[float, Any]:
+        """
+        Blocks until the main worker has finished iterative deepening to the
+        given depth, then stops the helpers and waits for them to unwind, so
+        all of their CPU time is charged to this move. Returns (value, best
+        move).
+        """
+        generation = int(self._header[0]) + 1
+        self._header[0] = generation
+
+        futures = [
+            self._submit(_lazy_search, self._block.name, self.entries,
+                         generation, worker_id, agent, board, depth)
+            for worker_id in range(self.processes)
+        ]
+        result = futures[0].result()[0]
+
+        # Helpers notice at their next node
+        self._header[0] = generation + 1
+        self._finish(futures)
+        return result
@@ -0,0 +1,169 @@
+"""
+Depth-first proof-number search (df-pn) for forced eliminations: can the
+side to move (the attacker) end the game as the winner within a number of
+its own moves, whatever the opponent plays?
+
+Every node keeps a (phi, delta) pair from the point of view of its side to
+move: phi is the proof number of that side's goal and delta the disproof
+number, so phi(n) = min delta(child) and delta(n) = sum phi(child). The
+search always descends into the most proving child with thresholds, and
+backs up only once they are exceeded, keeping results in its own table
+keyed by board and plies left. A node budget bounds the work, so an
+unfinished search simply reports UNKNOWN.
+"""
+from typing import Dict, Final, List, Optional, Tuple
+
+from referee.game import Action, PlayerColor
+from referee.game.constants import MAX_TURNS, WIN_POWER_DIFF
+from ..geometry import decode_move
+from ..position import RED, Position
+
+INFINITY: Final[int] = 1 << 30
+PROVEN: Final[int] = 1
+DISPROVEN: Final[int] = -1
+UNKNOWN: Final[int] = 0
+NO_MOVE: Final[int] = -1
+# Default size of a search: attacker moves looked ahead, nodes expanded,
+# and the most stacks the defender may have for it to be worth trying
+DFPN_MOVES: Final[int] = 2
+DFPN_NODES: Final[int] = 500
+DFPN_STACKS: Final[int] = 3
+TABLE_ENTRIES: Final[int] = 1 << 16
+
+class _BudgetExhausted(Exception):
+    """
+    Raised once a search has expanded all the nodes it may
+    """
+
+class ProofNumberSearch:
+    """
+    df-pn for "the side to move eliminates the opponent", with its own
+    transposition table, cleared at the start of every search
+    """
+    def __init__(self, max_nodes: int = DFPN_NODES, table_entries: int = TABLE_ENTRIES) -> None:
+        self.max_nodes = max_nodes
+        self.table_entries = table_entries
+        self.table: Dict[Tuple[bytes, int], Tuple[int, int]] = {}
+        self.nodes: int = 0
+        self._attacker: int = RED
+
+    def search(self, position: Position, moves: int = DFPN_MOVES) -> Tuple[int, int]:
+        """
+        (PROVEN, first move of the win), (DISPROVEN, NO_MOVE), or
+        (UNKNOWN, NO_MOVE) when the node budget ran out first. The position
+        is left as it was.
+        """
+        self.table.clear()
+        self.nodes = 0
+        self._attacker = position.color
+        plies = 2 * moves - 1
+        try:
+            phi, _ = self._mid(position, plies, INFINITY - 1, INFINITY - 1)
+        except _BudgetExhausted:
+            return UNKNOWN, NO_MOVE
+        if phi != 0:
+            return DISPROVEN, NO_MOVE
+        for move in position.legal_moves():
+            position.make(move)
+            _, delta = self._child_value(position, plies - 1)
+            position.unmake()
+            if delta == 0:
+                return PROVEN, move
+        return UNKNOWN, NO_MOVE
+
+    def _terminal(self, position: Position, plies: int) -> Optional[Tuple[int, int]]:
+        """
+        (phi, delta) of a position that needs no search: the game is over, or
+        the attacker has run out of moves
+        """
+        if position.red_power and position.blue_power:
+            if plies > 0 and position.turn < MAX_TURNS:
+                return None
+            return self._value(position, False)
+        attacker_power = position.red_power if self._attacker == RED else position.blue_power
+        defender_power = position.red_power + position.blue_power - attacker_power
+        return self._value(position, attacker_power - defender_power >= WIN_POWER_DIFF)
+
+    def _value(self, position: Position, proven: bool) -> Tuple[int, int]:
+        if (position.color == self._attacker) == proven:
+            return 0, INFINITY
+        return INFINITY, 0
+
+    def _child_value(self, position: Position, plies: int) -> Tuple[int, int]:
+        terminal = self._terminal(position, plies)
+        if terminal is not None:
+            return terminal
+        return self.table.get((position.key(), plies), (1, 1))
+
+    def _mid(self, position: Position, plies: int, threshold_phi: int,
+             threshold_delta: int) -> Tuple[int, int]:
+        """
+        Searches a non-terminal position until its phi or delta reaches its
+        threshold, returning them
+        """
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _BudgetExhausted
+        moves = position.legal_moves()
+        keys: List[bytes] = []
+        terminals: List[Optional[Tuple[int, int]]] = []
+        for move in moves:
+            position.make(move)
+            keys.append(position.key())
+            terminals.append(self._terminal(position, plies - 1))
+            position.unmake()
+
+        while True:
+            values = [
+                terminal if terminal is not None else self.table.get((key, plies - 1), (1, 1))
+                for key, terminal in zip(keys, terminals)
+            ]
+            phi = min(delta for _, delta in values)
+            delta = min(INFINITY, sum(child_phi for child_phi, _ in values))
+            if phi >= threshold_phi or delta >= threshold_delta:
+                self._store(position.key(), plies, phi, delta)
+                return phi, delta
+
+            # The child with the smallest delta, and the runner-up's delta
+            best = second_delta = -1
+            for i, (_, child_delta) in enumerate(values):
+                if best == -1 or child_delta < values[best][1]:
+                    if best != -1:
+                        second_delta = values[best][1]
+                    best = i
+                elif second_delta == -1 or child_delta < second_delta:
+                    second_delta = child_delta
+            if second_delta == -1:
+                second_delta = INFINITY
+            child_phi = values[best][0]
+            child_threshold_phi = threshold_delta + child_phi - delta
+            child_threshold_delta = min(threshold_phi, second_delta + 1)
+
+            position.make(moves[best])
+            try:
+                self._mid(position, plies - 1, child_threshold_phi, child_threshold_delta)
+            finally:
+                position.unmake()
+
+    def _store(self, key: bytes, plies: int, phi: int, delta: int) -> None:
+        if len(self.table) >= self.table_entries:
+            self.table.clear()
+        self.table[(key, plies)] = (phi, delta)
+
+def forced_elimination(board, color: PlayerColor, turn: int, moves: int = DFPN_MOVES,
+                       max_nodes: int = DFPN_NODES) -> Optional[Action]:
+    """
+    The first action of a proven elimination of color's opponent on a board
+    dict (colours either 'r'/'b' or PlayerColor), or None. Only searched
+    once the opponent is down to DFPN_STACKS stacks, so it is cheap to ask
+    every turn.
+    """
+    if turn < 2:
+        return None
+    position = Position()
+    position.load(board, color, turn)
+    defender_stacks = position.blue_tokens if position.color == RED else position.red_tokens
+    if defender_stacks == 0 or defender_stacks > DFPN_STACKS:
+        return None
+    status, move = ProofNumberSearch(max_nodes).search(position, moves)
+    return decode_move(move) if status == PROVEN else None
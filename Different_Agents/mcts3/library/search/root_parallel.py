@@ -0,0 +1,95 @@
+"""
+Root-splitting alpha-beta. The root moves of a minimax agent are searched in
+a pool of worker processes, each running the agent's own
+minimax(node, depth, isMaximizingPlayer, alpha, beta) on one child. The best
+value found so far is published through shared memory so that later root
+moves start with a tighter window, and outstanding work is abandoned as soon
+as a beta cutoff is proven at the root.
+"""
+import math
+from concurrent.futures import FIRST_COMPLETED, wait
+from time import process_time
+from typing import Any, List, Tuple
+
+import numpy as np
+from .shared import SearchCancelled, WorkerPool, attach
+
+# Layout of the shared bounds block
+ALPHA, BETA, GENERATION = range(3)
+
+def _search_child(block_name: str, generation: int, agent, child, depth: int):
+    """
+    Worker side: minimises over one root child with the freshest bounds.
+    Returns (value, cpu_seconds), with value None if the search was cancelled.
+    """
+    start = process_time()
+    bounds = np.ndarray((3,), dtype=np.float64, buffer=attach(block_name).buf)
+
+    def cancelled() -> bool:
+        return bounds[GENERATION] != generation
+
+    if cancelled():
+        return None, process_time() - start
+
+    # Every interior node asks for its moves first, so that is where a
+    # cancelled search notices and unwinds
+    get_possible_moves = agent.get_possible_moves
+    def checked_moves(*args, **kwargs):
+        if cancelled():
+            raise SearchCancelled
+        return get_possible_moves(*args, **kwargs)
+    agent.get_possible_moves = checked_moves
+
+    try:
+        value = agent.minimax(child, depth, False, bounds[ALPHA], bounds[BETA])[0]
+    except SearchCancelled:
+        value = None
+    return value, process_time() - start
+
+class RootParallelPool(WorkerPool):
+    """
+    A process pool for splitting minimax root moves
+    """
+    def __init__(self, processes: int) -> None:
+        super().__init__(processes, 3 * 8)
+        self._bounds = np.ndarray((3,), dtype=np.float64, buffer=self._block.buf)
+        self._bounds[:] = (-math.inf, math.inf, 0)
+
+    def search(self, agent, children: List[Tuple[Any, Any]], depth: int,
+               alpha: float = -math.inf, beta: float = math.inf) -> Tuple[float, Any]:
+        """
+        Maximises over (move, child board) pairs, searching each child to the
+        given depth with agent.minimax. Returns (value, best move).
+        """
+        generation = self._bounds[GENERATION] + 1
+        self._bounds[:] = (alpha, beta, generation)
+
+        pending = {}
+        for move, child in children:
+            future = self._submit(
+                _search_child, self._block.name, generation, agent, child, depth)
+            pending[future] = move
+        futures = list(pending)
+
+        value, best_move = -math.inf, None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                move = pending.pop(future)
+                child_value = future.result()[0]
+                if child_value is not None and child_value > value:
+                    value, best_move = child_value, move
+            if value >= beta:
+                break
+            # Later root moves start with the tighter window
+            self._bounds[ALPHA] = max(self._bounds[ALPHA], value)
+
+        if pending:
+            # Cutoff proven: drop queued moves and stop the running ones
+            self._bounds[GENERATION] = generation + 1
+            for future in pending:
+                future.cancel()
+        # Charge this move with all the workers' time, including what the
+        # stopped ones spent
+        self._finish(futures)
+        return value, best_move
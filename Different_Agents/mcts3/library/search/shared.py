@@ -0,0 +1,153 @@
+"""
+Helpers for the multi-process searches: attaching to shared memory blocks
+from worker processes and measuring the CPU time the workers spend, since the
+referee only charges the agent's own process with time.process_time().
+"""
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional
+
+class SearchCancelled(Exception):
+    """
+    Raised inside a worker once the search it belongs to is over
+    """
+
+# Blocks each worker process has already attached to, by name
+_ATTACHED: Dict[str, SharedMemory] = {}
+
+def attach(name: str) -> SharedMemory:
+    """
+    Attaches to a shared memory block created by the agent's process. Workers
+    are forked from the agent, so they share its resource tracker and the
+    agent stays responsible for unlinking the block.
+    """
+    if name not in _ATTACHED:
+        _ATTACHED[name] = SharedMemory(name=name)
+    return _ATTACHED[name]
+
+@contextmanager
+def closable_stdin():
+    """
+    The referee swaps sys.stdin for an object without close(), which
+    multiprocessing calls in every child it starts. Provide a real file while
+    worker processes are being forked.
+    """
+    if hasattr(sys.stdin, "close"):
+        yield
+        return
+    original = sys.stdin
+    sys.stdin = open(os.devnull, encoding="utf-8")
+    try:
+        yield
+    finally:
+        sys.stdin.close()
+        sys.stdin = original
+
+def _ready() -> bool:
+    return True
+
+def start_workers(executor) -> None:
+    """
+    Forks all of the executor's worker processes straight away
+    """
+    with closable_stdin():
+        executor.submit(_ready).result()
+
+class CpuLedger:
+    """
+    Running total of CPU seconds spent by worker processes on the agent's
+    behalf, to be subtracted from the referee's time_remaining
+    """
+    def __init__(self) -> None:
+        self.total: float = 0
+
+    def charge(self, seconds: float) -> None:
+        self.total += seconds
+
+    def remaining(self, time_remaining):
+        """
+        The referee's time_remaining once the workers' time is accounted for
+        """
+        if time_remaining is None:
+            return None
+        return time_remaining - self.total
+
+def _release(block: SharedMemory) -> None:
+    block.unlink()
+    try:
+        block.close()
+    except BufferError:
+        # A view is still alive; the mapping goes away with the process
+        pass
+
+class WorkerPool:
+    """
+    A pool of forked worker processes plus one shared memory block (none if
+    block_size is 0), kept alive for the whole game so workers are only
+    forked once
+    """
+    def __init__(self, processes: int, block_size: int = 0) -> None:
+        self.processes = processes
+        self.cpu = CpuLedger()
+        self._charge_lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._block: Optional[SharedMemory] = None
+        self._finalizer = None
+        if block_size > 0:
+            self._block = SharedMemory(create=True, size=block_size)
+            self._finalizer = weakref.finalize(self, _release, self._block)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=get_context("fork")
+            )
+            start_workers(self._executor)
+        return self._executor
+
+    def _submit(self, function, *args):
+        """
+        Submits a task returning (result, cpu_seconds); the CPU time is
+        charged whenever it finishes, even if nobody waits for it
+        """
+        future = self._get_executor().submit(function, *args)
+        future.add_done_callback(self._account)
+        return future
+
+    def _account(self, future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        # Called both by the executor's callback and by _finish, whichever
+        # comes first
+        with self._charge_lock:
+            if getattr(future, "cpu_charged", False):
+                return
+            future.cpu_charged = True
+        self.cpu.charge(future.result()[1])
+
+    def _finish(self, futures) -> None:
+        """
+        Waits for every future and charges its CPU time before returning,
+        instead of whenever the executor gets round to the callbacks. Raises
+        the first exception a worker raised.
+        """
+        wait(futures)
+        for future in futures:
+            self._account(future)
+        for future in futures:
+            if not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._finalizer is not None:
+            self._finalizer()
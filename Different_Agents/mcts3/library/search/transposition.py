@@ -0,0 +1,70 @@
+"""
+A transposition table laid out in a flat buffer of 64-bit words, so it can
+live in shared memory and be probed and stored by several processes without
+locks. Each entry is two words, (key ^ data, data): an entry torn by a
+concurrent write no longer XORs back to its key and is simply ignored.
+"""
+import struct
+from typing import Final, NamedTuple, Optional
+
+import numpy as np
+
+EXACT: Final[int] = 0
+LOWER: Final[int] = 1
+UPPER: Final[int] = 2
+
+ENTRY_BYTES: Final[int] = 16
+_MASK_64: Final[int] = (1 << 64) - 1
+
+class TableEntry(NamedTuple):
+    value: float
+    depth: int
+    flag: int
+    move_id: Optional[int]
+
+def _pack(value: float, depth: int, flag: int, move_id: Optional[int]) -> int:
+    value_bits = struct.unpack("<I", struct.pack("<f", value))[0]
+    move_bits = 0 if move_id is None else move_id + 1
+    return value_bits | (depth & 0xFF) << 32 | flag << 40 | move_bits << 42
+
+def _unpack(data: int) -> TableEntry:
+    value = struct.unpack("<f", struct.pack("<I", data & 0xFFFFFFFF))[0]
+    move_bits = data >> 42 & 0x3FF
+    return TableEntry(
+        value,
+        data >> 32 & 0xFF,
+        data >> 40 & 0x3,
+        move_bits - 1 if move_bits else None
+    )
+
+class TranspositionTable:
+    """
+    Fixed-size, always-replace-unless-shallower hash table over a buffer of
+    entries * ENTRY_BYTES bytes. entries must be a power of two.
+    """
+    def __init__(self, buffer, entries: int) -> None:
+        assert entries & (entries - 1) == 0
+        self.entries = entries
+        self._words = np.ndarray((entries, 2), dtype=np.uint64, buffer=buffer)
+
+    def clear(self) -> None:
+        self._words[:] = 0
+
+    def probe(self, key: int) -> Optional[TableEntry]:
+        slot = self._words[key & (self.entries - 1)]
+        data = int(slot[1])
+        if data == 0 or int(slot[0]) ^ data != key:
+            return None
+        return _unpack(data)
+
+    def store(self, key: int, value: float, depth: int, flag: int,
+              move_id: Optional[int]) -> None:
+        slot = self._words[key & (self.entries - 1)]
+        old_data = int(slot[1])
+        if old_data != 0 and int(slot[0]) ^ old_data == key \
+                and _unpack(old_data).depth > depth:
+            # Keep the deeper result for the same position
+            return
+        data = _pack(value, depth, flag, move_id)
+        slot[1] = data
+        slot[0] = (key ^ data) & _MASK_64
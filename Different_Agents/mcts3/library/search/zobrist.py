@@ -0,0 +1,31 @@
+"""
+Zobrist hashing of board dicts. Each (cell, signed power) pair has a fixed
+random 64-bit key, and a board hashes to the XOR of the keys of its stacks.
+The generator is seeded so every process (and every run) agrees on them.
+"""
+from random import Random
+from typing import Final, List
+
+from referee.game import PlayerColor
+from referee.game.constants import BOARD_N, MAX_CELL_POWER
+from ..geometry import NUM_CELLS
+
+_RED_VALUES = {'r', PlayerColor.RED}
+_rng = Random(30024)
+
+# ZOBRIST[cell][power + MAX_CELL_POWER], red powers positive, blue negative
+ZOBRIST: Final[List[List[int]]] = [
+    [_rng.getrandbits(64) for _ in range(2 * MAX_CELL_POWER + 1)]
+    for _ in range(NUM_CELLS)
+]
+# XORed in when the opponent of the searching player is to move
+SIDE_TO_MOVE: Final[int] = _rng.getrandbits(64)
+
+def board_hash(board) -> int:
+    """
+    Hash of a board dict, with colours either 'r'/'b' or PlayerColor
+    """
+    key = 0
+    for (r, q), (c, v) in board.items():
+        key ^= ZOBRIST[r * BOARD_N + q][MAX_CELL_POWER + (v if c in _RED_VALUES else -v)]
+    return key
@@ -1,6 +1,7 @@
 from datetime import datetime
 from os import listdir
 
+from mcts3.board.rollout import RolloutCache
 from mcts3.typedefs import BoardModError, SuccessMessage
 
 class Logger:
@@ -21,3 +22,7 @@ class Logger:
         with open(self.curr_file_name, 'a', encoding='utf-8') as file:
             file.write(message)
 
+
+    def log_rollout_cache(self, cache: RolloutCache):
+        with open(self.curr_file_name, 'a', encoding='utf-8') as file:
+            file.write(f"Rollout cache: {cache.report()} @ DATETIME {datetime.now()}\n")
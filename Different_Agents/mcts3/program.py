@@ -8,6 +8,25 @@ from referee.game import \
 
 from mcts3.logger import Logger
 from mcts3.board import Board
+from mcts3.board.mcts import ROLLOUT_POLICY
+from mcts3.board.rollout import EXCHANGE_CACHE, GREEDY_CACHE
+from mcts3.board.parallel import RootParallelMcts
+from mcts3.board.tree_parallel import TreeParallelMcts
+from mcts3.library.book import OpeningBook
+from mcts3.library.search import conversion_action, forced_elimination
+from mcts3.time_manager import TimeManager, CHECK_INTERVAL
+
+# Worker processes for parallel search (0 searches in this process only)
+PARALLEL_WORKERS = 0
+# "root" gives every worker its own tree, "tree" has them all grow one tree
+# in shared memory
+PARALLEL_MODE = "root"
+# Whether to play the opening book's moves instead of searching. Off, as in
+# 30 s games against greedyAgent mcts3 won 2 of 6 with the book and 6 of 6
+# without it
+USE_BOOK = False
+# The cache each rollout policy fills, reported in the game log after a search
+ROLLOUT_CACHES = {"exchange": EXCHANGE_CACHE, "greedy": GREEDY_CACHE}
 
 # This is the entry point for your game playing agent. Currently the agent
 # simply spawns a token at the centre of the board if playing as RED, and
@@ -27,17 +46,53 @@ class Agent:
         self._color = color
         self._current_board = Board()
         self._game_logger = Logger()
+        self._clock = TimeManager()
+        self._book = OpeningBook()
         self.num_moves = 0
+        self._search_pool = None
+        if PARALLEL_WORKERS > 0:
+            self._search_pool = TreeParallelMcts(PARALLEL_WORKERS) \
+                if PARALLEL_MODE == "tree" \
+                else RootParallelMcts(PARALLEL_WORKERS)
 
     def action(self, **referee: dict) -> Action:
         """
         Return the next action to take.
         """
+        # Without a space limit the referee reports a negative space_remaining
+        space_remaining = referee["space_remaining"] \
+            if referee["space_limit"] is not None else None
+        self._current_board.limit_memory(space_remaining) # type: ignore
+        if USE_BOOK:
+            book_move = self._book.lookup(
+                self._current_board.board_dict, self._color, self.num_moves)
+            if book_move is not None:
+                return book_move
+        forced_action = forced_elimination(
+            self._current_board.board_dict, self._color, self.num_moves)
+        if forced_action is not None:
+            return forced_action
+        conversion = conversion_action(
+            self._current_board.board_dict, self._color, self.num_moves)
+        if conversion is not None:
+            return conversion
         if referee["time_remaining"] is not None:
             remaining_time: int | float = referee["time_remaining"] # type: ignore
-            time_elapsed: int | float = 0
-            while (remaining_time - time_elapsed) > 0:
-                time_elapsed += self._current_board.train_MCTS(self._color, self.num_moves)
+            if self._search_pool is not None:
+                # Workers' CPU time counts against the agent too
+                remaining_time = self._search_pool.cpu.remaining(remaining_time)
+                self._clock.start(remaining_time, self.num_moves)
+                return self._search_pool.search(
+                    self._current_board.board_dict, self._color,
+                    self.num_moves, self._clock.budget)
+            self._clock.start(remaining_time, self.num_moves)
+            while True:
+                for _ in range(CHECK_INTERVAL):
+                    self._current_board.train_MCTS(self._color, self.num_moves)
+                if self._clock.should_stop(CHECK_INTERVAL, self._current_board.visit_gap()):
+                    break
+            if ROLLOUT_POLICY in ROLLOUT_CACHES:
+                self._game_logger.log_rollout_cache(ROLLOUT_CACHES[ROLLOUT_POLICY])
             return self._current_board.find_action()
 
         for _ in range(25):
@@ -50,5 +105,6 @@ class Agent:
         Update the agent with the last player's action.
         """
         result = self._current_board.update_board(action, color)
+        self._current_board.advance_tree(action)
         self._game_logger.log_board_result(result)
         self.num_moves += 1
@@ -0,0 +1,52 @@
+"""
+Splits the CPU time the referee allows over the moves the agent still
+expects to play, and decides when the search for one move can stop
+"""
+from time import process_time
+from typing import Final
+
+# Turns (of both players) a game is planned to last; past it, every move is
+# budgeted as if MIN_MOVES_LEFT remained
+EXPECTED_GAME_TURNS: Final[int] = 160
+MIN_MOVES_LEFT: Final[int] = 12
+# Fraction of the remaining time that is never handed out
+RESERVE: Final[float] = 0.05
+# MCTS iterations run between two checks of the clock
+CHECK_INTERVAL: Final[int] = 64
+
+class TimeManager:
+    """
+    Per-move CPU budget, measured with process_time as the referee does
+    """
+    def __init__(self) -> None:
+        self.budget: float = 0
+        self.started: float = 0
+        self.iterations: int = 0
+
+    def start(self, time_remaining: float, turn: int) -> None:
+        """
+        Begins timing a move, given the time left for the game and the number
+        of turns played so far
+        """
+        moves_left = max(MIN_MOVES_LEFT, (EXPECTED_GAME_TURNS - turn) // 2)
+        self.budget = time_remaining * (1 - RESERVE) / moves_left
+        self.started = process_time()
+        self.iterations = 0
+
+    def elapsed(self) -> float:
+        return process_time() - self.started
+
+    def should_stop(self, iterations: int, visit_gap: float) -> bool:
+        """
+        Whether to stop searching after another batch of iterations: once the
+        budget is spent, or once the most visited move leads the second by
+        more visits than the rest of the budget could possibly give it
+        """
+        self.iterations += iterations
+        elapsed = self.elapsed()
+        if elapsed >= self.budget:
+            return True
+        if elapsed <= 0:
+            return False
+        iterations_left = (self.budget - elapsed) * self.iterations / elapsed
+        return visit_gap > iterations_left
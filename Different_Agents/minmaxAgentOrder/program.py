@@ -43,12 +43,7 @@ class Agent:
         """
         print(power_difference_heuristic(self._board, self._color))
         if power_difference_heuristic(self._board, self._color) > 15:
-            move_values = []
-            for move in self.get_possible_moves(self._board, self._color):
-                new_board = self.apply_action(self._board, move, self._color)
-                move_values.append((move, power_difference_heuristic(new_board, self._color)))
-            random.shuffle(move_values)
-            return max(move_values, key = lambda x: x[1])[0]
+            return score_moves(self._board, self._color, 1)[0].action
         
         return self.minimax(self._board, CUTOFF_DEPTH, True, -math.inf, math.inf)[1]
 
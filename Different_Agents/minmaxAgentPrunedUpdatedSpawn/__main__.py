@@ -0,0 +1,19 @@
+"""
+Offline build of this agent's opening book:
+    python -m minmaxAgentPrunedUpdatedSpawn [--games N] [--turns N]
+"""
+import argparse
+
+from library.book import BOOK_GAMES, BOOK_TURNS, build_book
+from .program import BOOK_PATH, book_action
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m minmaxAgentPrunedUpdatedSpawn")
+    parser.add_argument("--games", type=int, default=BOOK_GAMES)
+    parser.add_argument("--turns", type=int, default=BOOK_TURNS)
+    parser.add_argument("--path", default=BOOK_PATH)
+    args = parser.parse_args()
+    build_book(book_action, args.games, args.turns, args.path)
+
+if __name__ == "__main__":
+    main()
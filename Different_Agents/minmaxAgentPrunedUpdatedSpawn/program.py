@@ -4,7 +4,10 @@
 from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
 from library.heuristics import *
+from library.search import RootParallelPool, LazySmpPool, conversion_action, forced_elimination
+from library.book import OpeningBook
 import numpy as np
+import os
 import random
 from copy import deepcopy
 import math
@@ -12,6 +15,17 @@ from collections import defaultdict
 DIRECTIONS = (HexDir.DownRight, HexDir.Down, HexDir.DownLeft, HexDir.UpLeft, HexDir.Up, HexDir.UpRight)
 CUTOFF_DEPTH = 3
 START_GAME = 15
+# Worker processes for the search; 0 keeps it on one core
+PARALLEL_WORKERS = 0
+# "root" splits the root moves between workers, "lazy_smp" runs the whole
+# search in every worker with a shared transposition table
+PARALLEL_MODE = "root"
+# Half-width of the root-parallel search window around the last move's value
+ASPIRATION_WINDOW = 2
+# This agent's own opening book, built offline by book_action searching
+# BOOK_DEPTH plies, one more than the agent searches in the opening
+BOOK_PATH = os.path.join(os.path.dirname(__file__), "opening.book")
+BOOK_DEPTH = CUTOFF_DEPTH + 2
 
 # This is the entry point for your game playing agent. Currently the agent
 # simply spawns a token at the centre of the board if playing as RED, and
@@ -28,6 +42,13 @@ class Agent:
         self._board = dict()
         self._turn = 0
         self._ref = dict()
+        self._search_pool = None
+        self._last_value = None
+        if PARALLEL_WORKERS > 0:
+            self._search_pool = LazySmpPool(PARALLEL_WORKERS) \
+                if PARALLEL_MODE == "lazy_smp" \
+                else RootParallelPool(PARALLEL_WORKERS)
+        self._book = OpeningBook(BOOK_PATH)
         match color:
             case PlayerColor.RED:
                 print("UpdatedSpawn I am playing as red")
@@ -42,14 +63,95 @@ class Agent:
         global START_GAME
 
         self._ref = referee
-        if self._ref["time_remaining"] != None and self._ref["time_remaining"] < 30:
+        book_move = self._book.lookup(self._board, self._color, self._turn)
+        if book_move is not None:
+            return book_move
+        forced_action = forced_elimination(self._board, self._color, self._turn)
+        if forced_action is not None:
+            return forced_action
+        conversion = conversion_action(self._board, self._color, self._turn)
+        if conversion is not None:
+            return conversion
+        time_remaining = self.time_remaining()
+        if time_remaining != None and time_remaining < 30:
                 CUTOFF_DEPTH = 2
                 START_GAME = 0
 
-        if self._turn < START_GAME:
-            return self.minimax(self._board, CUTOFF_DEPTH + 1, True, -math.inf, math.inf)[1]
-        else:
-            return self.minimax(self._board, CUTOFF_DEPTH, True, -math.inf, math.inf)[1]
+        depth = CUTOFF_DEPTH + 1 if self._turn < START_GAME else CUTOFF_DEPTH
+        if self._search_pool is not None:
+            return self.parallel_minimax(self._board, depth)[1]
+        return self.minimax(self._board, depth, True, -math.inf, math.inf)[1]
+
+    def time_remaining(self):
+        """
+        CPU time left, including what worker processes have used, since the
+        referee only measures this process
+        """
+        if self._search_pool is None:
+            return self._ref["time_remaining"]
+        return self._search_pool.cpu.remaining(self._ref["time_remaining"])
+
+    def parallel_minimax(self, node, depth):
+        """
+        The maximising root of minimax, searched by the worker processes
+        """
+        if depth == 0 or self.game_over(node, self._turn):
+            return self.minimax(node, depth, True, -math.inf, math.inf)
+
+        if isinstance(self._search_pool, LazySmpPool):
+            value, move = self._search_pool.search(self, node, depth)
+            if move is None:
+                return self.minimax(node, depth, True, -math.inf, math.inf)
+            return value, move
+
+        children = list(self.children(node, True))
+        if len(children) == 0:
+            return self.minimax(node, depth, True, -math.inf, math.inf)
+        # Aspiration window: a root move reaching beta ends the search early.
+        # A result outside the window is only a bound, so it is searched again
+        # from that bound, as far as the true value can lie
+        if self._last_value is not None and math.isfinite(self._last_value):
+            alpha = self._last_value - ASPIRATION_WINDOW
+            beta = self._last_value + ASPIRATION_WINDOW
+            value, move = self._search_pool.search(self, children, depth - 1, alpha, beta)
+            if alpha < value < beta and move is not None:
+                self._last_value = value
+                return value, move
+            if value >= beta and move is not None:
+                # Fail high: only a move beating this one can change the answer
+                higher, higher_move = self._search_pool.search(
+                    self, children, depth - 1, value, math.inf)
+                if higher > value and higher_move is not None:
+                    value, move = higher, higher_move
+                self._last_value = value
+                return value, move
+        value, move = self._search_pool.search(self, children, depth - 1)
+        self._last_value = value
+        return value, move
+
+    def children(self, node, isMaximizingPlayer):
+        """
+        The moves minimax searches from node, with the boards they lead to
+        """
+        color = self._color if isMaximizingPlayer else self._color.opponent
+        old_difference = token_difference_heuristic(node, self._color)
+        for move in self.get_possible_moves(node, color):
+            new_node = self.apply_action(node, move, color)
+            difference = token_difference_heuristic(new_node, self._color)
+            if isMaximizingPlayer and difference - old_difference <= 0:
+                continue
+            if not isMaximizingPlayer and difference - old_difference >= 0:
+                continue
+            yield move, new_node
+
+    def evaluate(self, node):
+        return power_difference_heuristic(node, self._color)
+
+    def __getstate__(self):
+        # Workers get a copy of the agent to search with, minus the pool
+        state = self.__dict__.copy()
+        state["_search_pool"] = None
+        return state
 
     def game_over(self, board, turn):
         blue_tokens = {(b_x, b_y): (b_c, b_v) for (b_x, b_y), (b_c, b_v) in board.items() if b_c == PlayerColor.BLUE}
@@ -227,5 +329,13 @@ class Agent:
                 self.spread(new_board, (cell.r, cell.q, direction.r, direction.q), color)
         return new_board
 
-
-        
+def book_action(board, color, turn):
+    """
+    The move a BOOK_DEPTH minimax picks for color on a board dict of
+    (r, q) -> ('r'/'b', power), for library.book.build_book
+    """
+    agent = Agent(color)
+    agent._board = {cell: (PlayerColor.RED if c == 'r' else PlayerColor.BLUE, v)
+                    for cell, (c, v) in board.items()}
+    agent._turn = turn
+    return agent.minimax(agent._board, BOOK_DEPTH, True, -math.inf, math.inf)[1]
@@ -0,0 +1,60 @@
+"""
+Puts the agents on the path the same way the referee runs them: the mcts3
+package and its shared library are imported as both `mcts3.library` and
+`library`. Also holds the random boards and positions the tests share.
+"""
+import os
+import random
+import sys
+from typing import Optional, Tuple
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "Different_Agents"),
+             os.path.join(ROOT, "Different_Agents", "mcts3")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from referee.game import PlayerColor
+from mcts3.library.position import Position
+
+@pytest.fixture
+def random_board():
+    """
+    Factory of board dicts of stacks on distinct random cells
+    """
+    def make(rng: random.Random, stacks: int, red: Optional[int] = None,
+             red_power: Tuple[int, int] = (1, 6), blue_power: Tuple[int, int] = (1, 6),
+             colors: tuple = ('r', 'b')) -> dict:
+        """
+        The first red stacks are red and the rest blue, or each stack's
+        colour is random when red is None. colors gives the red and blue
+        values, 'r'/'b' or PlayerColor.
+        """
+        board = {}
+        for i, cell in enumerate(rng.sample(range(49), stacks)):
+            if red is None:
+                color = rng.choice(colors)
+            else:
+                color = colors[0] if i < red else colors[1]
+            low, high = red_power if color == colors[0] else blue_power
+            board[divmod(cell, 7)] = (color, rng.randint(low, high))
+        return board
+    return make
+
+@pytest.fixture
+def random_position():
+    """
+    Factory of positions reached by random play from the empty board, RED
+    first, stopping early if the game ends
+    """
+    def make(rng: random.Random, moves: int) -> Position:
+        position = Position()
+        position.load({}, PlayerColor.RED)
+        for _ in range(moves):
+            if position.game_over():
+                break
+            position.make(rng.choice(position.legal_moves()))
+        return position
+    return make
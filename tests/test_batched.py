@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+from referee.game import PlayerColor
+from library.geometry import decode_move
+from library.heuristics import encode_board, encode_boards, successor_positions, \
+    power_difference_batch, token_difference_batch, surround_batch, \
+    power_within_reach_batch, minimum_move_estimation_batch, \
+    power_difference_heuristic, token_difference_heuristic, surround_heuristic, \
+    power_within_reach_heuristic, minimum_move_estimation
+from library.position import Position
+from mcts3.board.node_chooser import apply_action
+
+def _boards(random_board, count, seed=0):
+    rng = random.Random(seed)
+    return [random_board(rng, rng.randint(1, 16), colors=tuple(PlayerColor)) for _ in range(count)]
+
+def _split(board):
+    red = {k: v for k, v in board.items() if v[0] == PlayerColor.RED}
+    blue = {k: v for k, v in board.items() if v[0] == PlayerColor.BLUE}
+    return red, blue
+
+def test_batches_match_heuristics(random_board):
+    boards = _boards(random_board, 200)
+    positions = encode_boards(boards)
+    for color in PlayerColor:
+        power = power_difference_batch(positions, color)
+        tokens = token_difference_batch(positions, color)
+        surround = surround_batch(positions, color)
+        reach = power_within_reach_batch(positions, color)
+        for i, board in enumerate(boards):
+            red, blue = _split(board)
+            assert power[i] == power_difference_heuristic(board, color)
+            assert tokens[i] == token_difference_heuristic(board, color)
+            assert surround[i] == surround_heuristic(red, blue, color)
+            assert reach[i] == power_within_reach_heuristic(red, blue, color)
+    estimates = minimum_move_estimation_batch(positions)
+    for i, board in enumerate(boards):
+        chars = {k: ('r' if c == PlayerColor.RED else 'b', v) for k, (c, v) in board.items()}
+        assert estimates[i] == minimum_move_estimation(chars)
+
+def test_successor_positions_match_applied_boards(random_board):
+    for board in _boards(random_board, 50, seed=1):
+        for color in PlayerColor:
+            position = Position()
+            position.load(board, color, 10)
+            moves = position.legal_moves()
+            before = position.key()
+            successors = successor_positions(position, moves)
+            assert position.key() == before
+            for row, move in zip(successors, moves):
+                expected = encode_board(apply_action(board, decode_move(move), color))
+                assert np.array_equal(row, expected)
@@ -0,0 +1,48 @@
+import random
+
+from referee.game import PlayerColor
+from mcts3.board import node_chooser
+from mcts3.library.geometry import NEIGHBOURS, NUM_CELLS, encode_move
+from mcts3.library.position import Bitboard, cells, neighbours
+
+def _random_boards(random_position, seed: int, count: int):
+    """
+    Positions reached by random play, each with the colour char to move
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        position = random_position(rng, rng.randint(2, 30))
+        if position.game_over():
+            continue
+        color_char = 'r' if position.player == PlayerColor.RED else 'b'
+        yield position, color_char
+
+def test_backends_agree_on_greedy_action(monkeypatch, random_position):
+    for position, color_char in _random_boards(random_position, 0, 25):
+        results = {}
+        for backend in ("dict", "bitboard"):
+            monkeypatch.setattr(node_chooser, "BOARD_BACKEND", backend)
+            results[backend] = [encode_move(action) for action in node_chooser.greedy_action(
+                position.board_dict(), color_char, position.turn)]
+        assert results["dict"] == results["bitboard"]
+
+def test_bitboard_moves_and_successors_match_position(random_position):
+    for position, _ in _random_boards(random_position, 1, 40):
+        bits = Bitboard.from_board(position.board_dict())
+        assert bits.legal_moves(position.player) == position.legal_moves()
+        assert bits.eliminated() == (position.red_power == 0 or position.blue_power == 0)
+        for move in position.legal_moves():
+            after = bits.after(move, position.player)
+            position.make(move)
+            assert after.masks == Bitboard.from_board(position.board_dict()).masks
+            assert after.eliminated() == (position.red_power == 0 or position.blue_power == 0)
+            position.unmake()
+
+def test_neighbour_masks_match_the_neighbour_table():
+    for cell in range(NUM_CELLS):
+        assert sorted(cells(neighbours(1 << cell))) == sorted(set(NEIGHBOURS[cell].tolist()))
+    rng = random.Random(2)
+    for _ in range(50):
+        mask = rng.getrandbits(NUM_CELLS)
+        expected = {int(n) for cell in cells(mask) for n in NEIGHBOURS[cell]}
+        assert set(cells(neighbours(mask))) == expected
@@ -0,0 +1,84 @@
+import random
+from collections import Counter
+from functools import partial
+
+import numpy as np
+from referee.game import PlayerColor, SpawnAction
+from mcts3.board import search_action
+from mcts3.library.book import OpeningBook, build_book, position_key, write_book
+from mcts3.library.geometry import CELL_SOURCES, CELL_SYMMETRIES, MOVE_SYMMETRIES, \
+    NUM_CELLS, NUM_SYMMETRIES, canonical_board, cell_coordinates, decode_move, encode_move
+from mcts3.library.position import Position
+from minmaxAgentPrunedUpdatedSpawn import program as minimax_program
+
+def _transformed(position: Position, symmetry: int) -> dict:
+    """
+    The board dict of a position under a symmetry
+    """
+    return {
+        cell_coordinates(int(CELL_SYMMETRIES[symmetry, cell])): ('r' if value > 0 else 'b', abs(value))
+        for cell, value in enumerate(position.cells) if value
+    }
+
+def test_symmetries_commute_with_moves(random_position):
+    rng = random.Random(0)
+    for _ in range(30):
+        position = random_position(rng, rng.randint(2, 12))
+        symmetry = rng.randrange(NUM_SYMMETRIES)
+        for move in rng.sample(position.legal_moves(), 5):
+            moved = Position()
+            moved.load(_transformed(position, symmetry), position.player, position.turn)
+            moved.make(int(MOVE_SYMMETRIES[symmetry, move]))
+            position.make(move)
+            expected = np.frombuffer(position.key(), dtype=np.int8)[CELL_SOURCES[symmetry]]
+            assert np.array_equal(np.frombuffer(moved.key(), dtype=np.int8), expected)
+            position.unmake()
+
+def test_canonical_board_is_shared_by_every_symmetry(random_position):
+    rng = random.Random(1)
+    board = np.frombuffer(random_position(rng, 10).key(), dtype=np.int8)
+    canonical, symmetry = canonical_board(board)
+    assert np.array_equal(board[CELL_SOURCES[symmetry]], np.frombuffer(canonical, dtype=np.int8))
+    for other in rng.sample(range(NUM_SYMMETRIES), 20):
+        assert canonical_board(board[CELL_SOURCES[other]])[0] == canonical
+
+def test_book_moves_follow_symmetries_and_colour_swaps(tmp_path, random_position):
+    rng = random.Random(2)
+    position = random_position(rng, 6)
+    move = rng.choice(position.legal_moves())
+    key, symmetry = position_key(position)
+    path = str(tmp_path / "opening.book")
+    write_book({key: Counter({int(MOVE_SYMMETRIES[symmetry, move]): 3})}, 12, path)
+    book = OpeningBook(path)
+
+    assert book.lookup(position.board_dict(), position.player, position.turn) == decode_move(move)
+    other = rng.randrange(NUM_SYMMETRIES)
+    assert book.lookup(_transformed(position, other), position.player, position.turn) \
+        == decode_move(int(MOVE_SYMMETRIES[other, move]))
+    swapped = {cell: ('b' if c == 'r' else 'r', v) for cell, (c, v) in position.board_dict().items()}
+    assert book.lookup(swapped, position.player.opponent, position.turn) == decode_move(move)
+    assert book.lookup(position.board_dict(), position.player, 12) is None
+    assert book.lookup({}, PlayerColor.RED, 0) is None
+
+def test_missing_book_is_empty(tmp_path):
+    assert OpeningBook(str(tmp_path / "missing.book")).lookup({}, PlayerColor.RED, 0) is None
+
+def test_built_book_covers_the_opening(tmp_path):
+    path = str(tmp_path / "opening.book")
+    build_book(partial(search_action, seconds=0.01), games=1, turns=2, path=path)
+    book = OpeningBook(path)
+    first = book.lookup({}, PlayerColor.RED, 0)
+    assert first is not None and encode_move(first) < NUM_CELLS
+    # Every first spawn is the same position up to a shift
+    reply = book.lookup({(5, 2): ('r', 1)}, PlayerColor.BLUE, 1)
+    assert reply is not None
+
+def test_minimax_agent_books_its_own_search(tmp_path, monkeypatch):
+    monkeypatch.setattr(minimax_program, "BOOK_DEPTH", 1)
+    path = str(tmp_path / "opening.book")
+    build_book(minimax_program.book_action, games=1, turns=2, path=path)
+    monkeypatch.setattr(minimax_program, "BOOK_PATH", path)
+    agent = minimax_program.Agent(PlayerColor.RED)
+    first = agent.action(time_remaining=None, space_remaining=None, space_limit=None)
+    assert first == OpeningBook(path).lookup({}, PlayerColor.RED, 0)
+    assert isinstance(first, SpawnAction)
@@ -0,0 +1,49 @@
+import random
+
+from referee.game import PlayerColor
+from referee.game.constants import WIN_POWER_DIFF
+from library.geometry import encode_move
+from library.position import Position
+from library.search import CONVERSION_MARGIN, conversion_action
+
+def _winning_board(random_board, rng: random.Random) -> dict:
+    return random_board(rng, 12, red=8, red_power=(3, 6), blue_power=(1, 2))
+
+def test_conversion_moves_capture_and_keep_the_win(random_board):
+    rng = random.Random(0)
+    played = 0
+    for _ in range(40):
+        board = _winning_board(random_board, rng)
+        action = conversion_action(board, PlayerColor.RED, 30)
+        if action is None:
+            continue
+        played += 1
+        position = Position()
+        position.load(board, PlayerColor.RED, 30)
+        before = position.blue_tokens, position.blue_power
+        position.make(encode_move(action))
+        assert (position.blue_tokens, position.blue_power) < before
+        if position.blue_tokens == 0:
+            continue
+        for reply in position.legal_moves():
+            position.make(reply)
+            assert position.red_power - position.blue_power >= WIN_POWER_DIFF
+            position.unmake()
+    assert played > 10
+
+def test_conversion_finishes_the_game_when_it_can():
+    board = {(3, 3): ('r', 2), (3, 4): ('b', 1)}
+    board.update({(0, q): ('r', 6) for q in range(3)})
+    assert conversion_action(board, PlayerColor.RED, 30) is not None
+    position = Position()
+    position.load(board, PlayerColor.RED, 30)
+    position.make(encode_move(conversion_action(board, PlayerColor.RED, 30)))
+    assert position.blue_tokens == 0
+
+def test_conversion_leaves_close_games_to_the_search(random_board):
+    board = {(3, 3): ('r', 6), (0, 0): ('r', 6), (3, 4): ('b', 1)}
+    position = Position()
+    position.load(board, PlayerColor.RED, 30)
+    assert position.red_power - position.blue_power <= CONVERSION_MARGIN
+    assert conversion_action(board, PlayerColor.RED, 30) is None
+    assert conversion_action(_winning_board(random_board, random.Random(1)), PlayerColor.RED, 1) is None
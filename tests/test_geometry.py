@@ -0,0 +1,64 @@
+import math
+
+from referee.game import HexDir
+from library.geometry import NUM_CELLS, NEIGHBOURS, SPREAD_TARGETS, LINE_DISTANCE, \
+    cell_index, cell_coordinates
+from library.heuristics.heuristic import same_relative_row
+
+def _old_same_relative_row(x1, y1, x2, y2):
+    """
+    same_relative_row before the geometry tables
+    """
+    if x1 == x2 or y1 == y2:
+        return True
+    elif (math.floor((x1 - x2)/6) == -1 and math.ceil((y1 - y2)/6) == 1):
+        return True
+    elif (math.floor((x1 - x2)/6) == 1 and math.ceil((y1 - y2)/6) == -1):
+        return True
+    return False
+
+def _on_torus_line(x1, y1, x2, y2):
+    for direction in HexDir:
+        for step in range(7):
+            if ((x1 + step * direction.r) % 7, (y1 + step * direction.q) % 7) == (x2, y2):
+                return True
+    return False
+
+PAIRS = [(x1, y1, x2, y2) for x1 in range(7) for y1 in range(7)
+         for x2 in range(7) for y2 in range(7)]
+
+def test_cell_index_round_trip():
+    for cell in range(NUM_CELLS):
+        assert cell_index(*cell_coordinates(cell)) == cell
+
+def test_neighbours_are_first_spread_targets():
+    for cell in range(NUM_CELLS):
+        r, q = cell_coordinates(cell)
+        expected = [cell_index((r + d.r) % 7, (q + d.q) % 7) for d in HexDir]
+        assert NEIGHBOURS[cell].tolist() == expected
+        assert SPREAD_TARGETS[cell, :, 0].tolist() == expected
+
+def test_line_distance_is_symmetric():
+    assert (LINE_DISTANCE == LINE_DISTANCE.T).all()
+
+def test_same_relative_row_follows_torus_lines():
+    for pair in PAIRS:
+        assert same_relative_row(*pair) == _on_torus_line(*pair), pair
+
+def test_same_relative_row_changed_pairs():
+    """
+    The table version differs from the old arithmetic exactly where the old
+    one was wrong about a torus line, in both directions
+    """
+    changed = {pair for pair in PAIRS
+               if same_relative_row(*pair) != _old_same_relative_row(*pair)}
+    wrong = {pair for pair in PAIRS
+             if _on_torus_line(*pair) != _old_same_relative_row(*pair)}
+    assert changed == wrong
+    assert len(changed) == 552
+    # Off-line pairs with opposite-sign offsets were on a line before
+    assert (0, 1, 2, 0) in changed and not same_relative_row(0, 1, 2, 0)
+    assert (0, 1, 3, 0) in changed and not same_relative_row(0, 1, 3, 0)
+    # and real (1, -1) diagonals wrapping round the board were not
+    assert (0, 0, 1, 6) in changed and same_relative_row(0, 0, 1, 6)
+    assert (0, 0, 3, 4) in changed and same_relative_row(0, 0, 3, 4)
@@ -0,0 +1,49 @@
+import math
+import time
+
+import numpy as np
+from referee.game import PlayerColor
+from library.search import LazySmpPool, TranspositionTable
+from library.search.transposition import ENTRY_BYTES
+from library.search.lazy_smp import _Searcher
+from minmaxAgentPrunedUpdatedSpawn.program import Agent
+
+RED, BLUE = PlayerColor.RED, PlayerColor.BLUE
+BOARD = {
+    (0, 0): (RED, 2), (1, 3): (RED, 1), (3, 3): (RED, 3), (5, 1): (RED, 1),
+    (0, 2): (BLUE, 1), (2, 4): (BLUE, 2), (4, 4): (BLUE, 1), (6, 6): (BLUE, 3),
+}
+
+def _agent():
+    agent = Agent(RED)
+    agent._board = dict(BOARD)
+    agent._turn = 20
+    return agent
+
+def test_root_search_after_warm_table_returns_a_legal_move():
+    agent = _agent()
+    entries = 1 << 12
+    table = TranspositionTable(bytearray(entries * ENTRY_BYTES), entries)
+    table.clear()
+    header = np.zeros(1, dtype=np.int64)
+    # A helper searching one deeper stores the root first
+    helper = _Searcher(agent, table, header, 0, 0.15)
+    helper.alphabeta(agent._board, 3, True, -math.inf, math.inf)
+    main = _Searcher(agent, table, header, 0, 0)
+    for depth in (1, 2):
+        value, move = main.alphabeta(agent._board, depth, True, -math.inf, math.inf)
+        assert move is not None
+        assert move in agent.get_possible_moves(agent._board, RED)
+
+def test_helpers_are_charged_before_search_returns():
+    agent = _agent()
+    pool = LazySmpPool(2, entries=1 << 12)
+    try:
+        value, move = pool.search(agent, agent._board, 2)
+        assert move is not None
+        charged = pool.cpu.total
+        assert charged > 0
+        time.sleep(0.5)
+        assert pool.cpu.total == charged
+    finally:
+        pool.close()
@@ -0,0 +1,211 @@
+import math
+import random
+from array import array
+
+import numpy as np
+from referee.game import HexDir, HexPos, PlayerColor, SpreadAction
+from mcts3.board import Board
+from mcts3.board.mcts import C_FACTOR, NODE_COLUMNS, NO_NODE, PENDING_VALUE, PROVEN_LOSS, \
+    RAVE_EQUIVALENCE, UNPROVEN, WIDENING_ALPHA, WIDENING_K, NodePool, leaf_values, ordered_moves
+from mcts3.library.position import Position
+
+def _grow(pool: NodePool, seed: int, iterations: int = 40):
+    """
+    Adds random lines below the root of a fresh pool, returning every leaf
+    with the moves leading to it and its position's cells
+    """
+    rng = random.Random(seed)
+    position = Position()
+    position.load({(3, 3): ('r', 2), (1, 1): ('b', 1), (5, 2): ('b', 2)}, PlayerColor.RED, 4)
+    pool.reset(position.key(), PlayerColor.RED)
+    leaves = []
+    for _ in range(iterations):
+        node = pool.root
+        for _ in range(rng.randint(1, 3)):
+            move = rng.choice(position.legal_moves())
+            position.make(move)
+            child = pool.child_with_move(node, move)
+            if child == -1:
+                child = pool.add(position.key(), node, move)
+            node = child
+        leaves.append((node, list(position.history), bytes(position.cells)))
+        while position.history:
+            position.unmake()
+    return leaves
+
+def _statistics(pool: NodePool):
+    size = pool.size
+    return [column[:size].copy() for column in (
+        pool.visits, pool.wins, pool.amaf_visits, pool.amaf_wins)]
+
+def test_deferred_leaves_match_immediate_backpropagation():
+    deferred, immediate = NodePool(), NodePool()
+    leaves = _grow(deferred, 0)
+    assert _grow(immediate, 0) == leaves
+    values = leaf_values(np.array([np.frombuffer(cells, dtype=np.int8) for _, _, cells in leaves]))
+    position = Position()
+    for (node, moves, cells), value in zip(leaves, values.tolist()):
+        position.cells[:] = array("b", cells)
+        position.history[:] = moves
+        deferred.defer(node, position)
+        immediate.backpropagate(node, value, moves)
+    deferred.flush()
+    for ours, theirs in zip(_statistics(deferred), _statistics(immediate)):
+        assert np.allclose(ours, theirs)
+
+def test_queued_leaves_count_as_even_until_flushed():
+    pool = NodePool()
+    (node, moves, cells), = _grow(pool, 1, iterations=1)
+    position = Position()
+    position.cells[:] = array("b", cells)
+    position.history[:] = moves
+    pool.defer(node, position)
+    while node != -1:
+        assert pool.visits[node] == 1
+        assert pool.wins[node] == PENDING_VALUE
+        node = int(pool.parent[node])
+
+_LINKS = ("parent", "first_child", "next_sibling")
+
+def _subtree(pool: NodePool, node: int, path=()):
+    """
+    Every node below node (inclusive) by the moves reaching it, with its
+    columns other than the links
+    """
+    rows = {path: tuple(
+        getattr(pool, column)[node].tobytes() for column, _ in NODE_COLUMNS
+        if column not in _LINKS and column != "move")}
+    for child in pool.children(node):
+        rows.update(_subtree(pool, child, path + (int(pool.move[child]),)))
+    return rows
+
+def _check_links(pool: NodePool) -> int:
+    """
+    Asserts every reachable node's links agree, returning how many there are
+    """
+    order = [pool.root]
+    for node in order:
+        children = pool.children(node)
+        assert pool.num_children[node] == len(children)
+        for child in children:
+            assert pool.parent[child] == node
+        order.extend(children)
+    assert len(set(order)) == len(order)
+    return len(order)
+
+def _search(iterations: int) -> Board:
+    board = Board({(3, 3): ('r', 2), (1, 1): ('b', 1), (5, 2): ('b', 2)}, preload=False)
+    Board.tree.reset_empty()
+    for _ in range(iterations):
+        board.train_MCTS(PlayerColor.RED, 4)
+    Board.tree.flush()
+    return board
+
+def test_advance_keeps_the_subtree_of_the_move_played():
+    _search(400)
+    pool = Board.tree
+    child = max(pool.children(pool.root), key=lambda node: pool.visits[node])
+    move = int(pool.move[child])
+    expected = _subtree(pool, child)
+    pool.advance(move)
+    assert pool.root == 0 and pool.parent[0] == NO_NODE
+    assert _subtree(pool, pool.root) == expected
+    assert pool.size == _check_links(pool) == len(expected)
+
+def test_eviction_stays_within_the_cap_and_keeps_links_whole():
+    pool = Board.tree
+    pool.reset_empty()
+    pool.max_nodes = 300
+    try:
+        _search(1000)
+        # Far more iterations than nodes, so the pool has been full a while
+        assert pool.size == pool.max_nodes
+        assert pool.size - len(pool.free) <= pool.max_nodes
+        assert _check_links(pool) == pool.size - len(pool.free)
+        for node in pool.free:
+            assert pool.parent[node] == NO_NODE
+    finally:
+        pool.max_nodes = None
+
+
+def _widening_limit(visits: int) -> int:
+    return max(1, int(WIDENING_K * visits ** WIDENING_ALPHA))
+
+def test_widening_caps_children_by_visits():
+    position = Position()
+    position.load({(3, 3): ('r', 2), (1, 1): ('b', 1), (5, 2): ('b', 2)}, PlayerColor.RED, 4)
+    moves = ordered_moves(position)
+    pool = NodePool()
+    for visits in (0, 1, 4, 9, 30):
+        pool.reset(position.key(), PlayerColor.RED)
+        pool.visits[pool.root] = visits
+        added = []
+        while pool.should_expand(pool.root, position):
+            move = pool.next_move(pool.root)
+            position.make(move)
+            pool.add(position.key(), pool.root, move)
+            position.unmake()
+            added.append(move)
+        assert len(added) == _widening_limit(visits)
+        # Best moves first, as ordered_moves lists them worst to best
+        assert added == list(moves[::-1][:len(added)])
+
+def test_search_keeps_every_node_within_its_widening_limit():
+    _search(600)
+    pool = Board.tree
+    widened = 0
+    for node in range(pool.size):
+        if not pool.untried.get(node) or pool.num_proven[node] == pool.num_children[node]:
+            continue
+        assert pool.num_children[node] <= _widening_limit(int(pool.visits[node]))
+        widened += pool.num_children[node] > 1
+    assert widened > 0
+
+def test_solver_proves_a_win_in_one():
+    board = Board({(3, 3): ('r', 2), (3, 4): ('b', 1), (0, 0): ('r', 1)}, preload=False)
+    Board.tree.reset_empty()
+    for _ in range(200):
+        board.train_MCTS(PlayerColor.RED, 10)
+    pool = Board.tree
+    # Proven lost for BLUE, who moved into the root
+    assert pool.status[pool.root] == PROVEN_LOSS
+    assert board.find_action() == SpreadAction(HexPos(3, 3), HexDir.DownRight)
+
+def test_select_matches_the_scalar_bound():
+    _search(600)
+    pool = Board.tree
+    checked = 0
+    for node in range(pool.size):
+        children = [child for child in pool.children(node) if pool.status[child] == UNPROVEN]
+        if len(children) < 2 or any(pool.visits[child] == 0 for child in children):
+            continue
+        def bound(child):
+            visits = float(pool.visits[child])
+            value = pool.wins[child] / visits
+            if pool.amaf_visits[child] > 0:
+                beta = math.sqrt(RAVE_EQUIVALENCE / (3 * visits + RAVE_EQUIVALENCE))
+                value += beta * (pool.amaf_wins[child] / pool.amaf_visits[child] - value)
+            return value + C_FACTOR * math.sqrt(math.log10(int(pool.visits[node])) / visits)
+        assert pool.select(node) == max(children, key=bound)
+        checked += 1
+    assert checked > 0
+
+def test_flush_corrects_only_the_children_credited_at_defer():
+    pool = NodePool()
+    position = Position()
+    position.load({(3, 3): ('r', 2), (1, 1): ('b', 1)}, PlayerColor.RED, 4)
+    pool.reset(position.key(), PlayerColor.RED)
+    spawns = [0, 2, 4, 6]
+    node = pool.root
+    for move in spawns[:2]:
+        position.make(move)
+        node = pool.add(position.key(), node, move)
+    for move in spawns[2:]:
+        position.make(move)
+    pool.defer(node, position)
+    # RED's later spawn on 4 gets a child at the root only after the playout
+    # was queued, so it never had the pending AMAF visit
+    late = pool.add(b"\0" * 49, pool.root, spawns[2])
+    pool.flush()
+    assert pool.amaf_visits[late] == 0
+    assert pool.amaf_wins[late] == 0
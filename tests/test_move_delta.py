@@ -0,0 +1,48 @@
+import random
+
+from referee.game import HexPos, PlayerColor, SpreadAction
+from library.geometry import DIRECTIONS, encode_move
+from library.heuristics import score_moves, spread_delta
+from library.position import Position
+
+def _differences(position: Position, color: PlayerColor):
+    sign = 1 if color == PlayerColor.RED else -1
+    return (sign * (position.red_power - position.blue_power),
+            sign * (position.red_tokens - position.blue_tokens))
+
+def _random_board(random_board, rng: random.Random) -> dict:
+    """
+    A board dict with PlayerColor colours, as greedyAgent keeps it
+    """
+    return random_board(rng, rng.randint(2, 25), colors=tuple(PlayerColor))
+
+def test_scores_match_playing_the_move(random_board):
+    rng = random.Random(0)
+    for _ in range(100):
+        board = _random_board(random_board, rng)
+        color = rng.choice(list(PlayerColor))
+        position = Position()
+        position.load(board, color, 10)
+        before = _differences(position, color)
+        scores = score_moves(board, color)
+        assert len(scores) == len(position.legal_moves())
+        for score in scores:
+            position.make(encode_move(score.action))
+            after = _differences(position, color)
+            position.unmake()
+            assert (score.power_delta, score.token_delta) == \
+                (after[0] - before[0], after[1] - before[1])
+
+def test_spread_delta_and_best_first_order(random_board):
+    rng = random.Random(1)
+    board = _random_board(random_board, rng)
+    color = board[next(iter(board))][0]
+    scores = score_moves(board, color)
+    keys = [(score.power_delta, score.token_delta) for score in scores]
+    assert keys == sorted(keys, reverse=True)
+    assert score_moves(board, color, 3)[0][:2] == scores[0][:2]
+    by_action = {score.action: (score.power_delta, score.token_delta) for score in scores}
+    cell = next(cell for cell, (c, _) in board.items() if c == color)
+    for direction_id, direction in enumerate(DIRECTIONS):
+        action = SpreadAction(HexPos(*cell), direction)
+        assert spread_delta(board, cell, direction_id, color) == by_action[action]
@@ -0,0 +1,27 @@
+from referee.game import PlayerColor
+from mcts3.board import Board
+from mcts3.board.mcts import PROVEN_LOSS, PROVEN_WIN, UNPROVEN
+from mcts3.board.parallel import _grow_tree, merge_children
+
+BOARD = {(3, 3): ('r', 2), (1, 1): ('b', 1), (5, 2): ('b', 2)}
+
+def test_merged_visits_sum_the_workers_playouts(monkeypatch):
+    playouts = 0
+    train = Board.train_MCTS
+
+    def counted(board, color, turn):
+        nonlocal playouts
+        playouts += 1
+        return train(board, color, turn)
+
+    monkeypatch.setattr(Board, "train_MCTS", counted)
+    # Both tasks run in this process, as two tasks sent to one worker would
+    results = [_grow_tree(BOARD, PlayerColor.RED, 4, seed, 0.2)[0] for seed in (1, 2)]
+    assert playouts > 0
+    assert sum(visits for children in results for _, visits, _, _ in children) == playouts
+
+def test_merge_prefers_proven_wins_then_total_visits():
+    first = [(0, 10, 5.0, UNPROVEN), (1, 8, 4.0, UNPROVEN), (2, 30, 3.0, PROVEN_LOSS)]
+    second = [(0, 3, 1.0, UNPROVEN), (1, 9, 6.0, UNPROVEN)]
+    assert merge_children([first, second]) == 1
+    assert merge_children([first, second + [(5, 1, 1.0, PROVEN_WIN)]]) == 5
@@ -0,0 +1,51 @@
+import random
+
+from referee.game import PlayerColor
+from mcts3.board import Board
+from mcts3.library.geometry import decode_move
+from mcts3.library.position import Position
+from mcts3.typedefs import SuccessMessage
+
+def _state(position: Position):
+    return (bytes(position.cells), position.color, position.turn,
+            position.red_power, position.blue_power, position.red_tokens, position.blue_tokens,
+            list(position.history))
+
+def test_unmake_restores_every_earlier_position():
+    rng = random.Random(0)
+    for _ in range(20):
+        position = Position()
+        position.load({}, PlayerColor.RED)
+        states = []
+        while not position.game_over() and position.ply < 60:
+            states.append(_state(position))
+            position.make(rng.choice(position.legal_moves()))
+        while states:
+            position.unmake()
+            assert _state(position) == states.pop()
+
+def test_make_matches_the_board_rules():
+    rng = random.Random(1)
+    for _ in range(20):
+        position = Position()
+        position.load({}, PlayerColor.RED)
+        board = Board({}, preload=False)
+        while not position.game_over() and position.ply < 60:
+            move = rng.choice(position.legal_moves())
+            assert isinstance(board.update_board(decode_move(move), position.player), SuccessMessage)
+            position.make(move)
+            assert position.board_dict() == board.board_dict
+            recounted = Position()
+            recounted.load(board.board_dict, position.player, position.turn)
+            assert _state(recounted)[:7] == _state(position)[:7]
+
+def test_copy_from_drops_history():
+    rng = random.Random(2)
+    position = Position()
+    position.load({}, PlayerColor.RED)
+    for _ in range(8):
+        position.make(rng.choice(position.legal_moves()))
+    copy = Position()
+    copy.copy_from(position)
+    assert _state(copy)[:7] == _state(position)[:7]
+    assert copy.history == []
@@ -0,0 +1,78 @@
+import random
+
+from referee.game import PlayerColor, SpreadAction, HexDir
+from referee.game.constants import MAX_TURNS, WIN_POWER_DIFF
+from referee.game.hex import HexPos
+from library.position import RED, Position
+from library.search import DISPROVEN, PROVEN, UNKNOWN, ProofNumberSearch, forced_elimination
+
+def _margin(position: Position, attacker: int) -> int:
+    return (position.red_power - position.blue_power) * (1 if attacker == RED else -1)
+
+def _attacker_wins(position: Position, attacker: int, plies: int) -> bool:
+    """
+    Plain AND/OR search with the same rules as df-pn: the attacker must
+    eliminate the defender and be WIN_POWER_DIFF ahead within plies
+    """
+    if not (position.red_power and position.blue_power):
+        return _margin(position, attacker) >= WIN_POWER_DIFF
+    if plies == 0 or position.turn >= MAX_TURNS:
+        return False
+    results = []
+    for move in position.legal_moves():
+        position.make(move)
+        results.append(_attacker_wins(position, attacker, plies - 1))
+        position.unmake()
+    return any(results) if position.color == attacker else all(results)
+
+def _random_endgame(random_board, rng: random.Random) -> Position:
+    """
+    A position with a few stacks each, the defender's weak, so that both
+    answers turn up
+    """
+    position = Position()
+    position.load(random_board(rng, 5, red=3, red_power=(1, 4), blue_power=(1, 2)),
+                  PlayerColor.RED, 10)
+    return position
+
+def test_one_move_results_match_brute_force(random_board):
+    rng = random.Random(0)
+    outcomes = set()
+    for _ in range(60):
+        position = _random_endgame(random_board, rng)
+        before = position.key()
+        status, move = ProofNumberSearch(max_nodes=10_000).search(position, 1)
+        assert position.key() == before and position.history == []
+        assert status != UNKNOWN
+        assert (status == PROVEN) == _attacker_wins(position, RED, 1)
+        if status == PROVEN:
+            position.make(move)
+            assert _attacker_wins(position, RED, 0)
+            position.unmake()
+        outcomes.add(status)
+    assert outcomes == {PROVEN, DISPROVEN}
+
+def test_two_move_results_match_brute_force(random_board):
+    rng = random.Random(1)
+    positions = [_random_endgame(random_board, rng) for _ in range(2)]
+    # Red wins at once here, which must still count with two moves to go
+    won = Position()
+    won.load({(3, 3): ('r', 2), (3, 4): ('b', 1), (0, 0): ('r', 1)}, PlayerColor.RED, 10)
+    for position in positions + [won]:
+        status, move = ProofNumberSearch(max_nodes=100_000).search(position, 2)
+        assert status != UNKNOWN
+        assert (status == PROVEN) == _attacker_wins(position, RED, 3)
+        if status == PROVEN:
+            position.make(move)
+            assert _attacker_wins(position, RED, 2)
+            position.unmake()
+
+def test_forced_elimination():
+    board = {(3, 3): ('r', 2), (3, 4): ('b', 1), (0, 0): ('r', 1)}
+    assert forced_elimination(board, PlayerColor.RED, 10) \
+        == SpreadAction(HexPos(3, 3), HexDir.DownRight)
+    # Too early in the game, and too many defending stacks to try
+    assert forced_elimination(board, PlayerColor.RED, 1) is None
+    crowded = dict(board)
+    crowded.update({(0, 2): ('b', 1), (0, 4): ('b', 1), (0, 6): ('b', 1)})
+    assert forced_elimination(crowded, PlayerColor.RED, 10) is None
@@ -0,0 +1,92 @@
+import random
+
+from referee.game import PlayerColor
+from mcts3.board.node_chooser import greedy_action
+from mcts3.board.rollout import CACHE_MEMORY_SHARE, EPSILON, EXCHANGE_CACHE, EXCHANGE_WEIGHTS, \
+    EXCHANGE_RANGE, GREEDY_CACHE, RolloutCache, capture_policy, exchange_moves, exchange_policy, \
+    greedy_policy, uniform_policy
+from mcts3.library.geometry import cell_index, encode_move, spread_id
+from mcts3.library.position import Position
+
+def _position(board: dict, turn: int) -> Position:
+    position = Position()
+    position.load(board, PlayerColor.RED, turn)
+    return position
+
+def _random_positions(random_position, seed: int, count: int):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield random_position(rng, rng.randint(4, 14))
+
+def test_greedy_policy_matches_greedy_action_and_hits_on_repeats(random_position):
+    GREEDY_CACHE.clear()
+    rng = random.Random(0)
+    positions = list(_random_positions(random_position, 0, 10))
+    for position in positions:
+        color_char = 'r' if position.player == PlayerColor.RED else 'b'
+        expected = encode_move(next(greedy_action(position.board_dict(), color_char, position.turn)))
+        assert greedy_policy(position, rng) == expected
+        assert greedy_policy(position, rng) == expected
+    assert GREEDY_CACHE.misses == len(positions)
+    assert GREEDY_CACHE.hits == len(positions)
+
+def test_turn_bucket_separates_entries():
+    GREEDY_CACHE.clear()
+    board = {(3, 3): ('r', 2), (3, 4): ('b', 1)}
+    early, late = _position(board, 2), _position(board, 3)
+    assert early.key() == late.key()
+    greedy_policy(early, random.Random(0))
+    greedy_policy(late, random.Random(0))
+    assert GREEDY_CACHE.misses == 2 and GREEDY_CACHE.hits == 0
+    assert len(GREEDY_CACHE.entries) == 2
+
+def test_exchange_moves_are_legal_with_increasing_weights(random_position):
+    for position in _random_positions(random_position, 1, 20):
+        moves, cum_weights = exchange_moves(position)
+        assert sorted(moves) == sorted(position.legal_moves())
+        assert all(low < high for low, high in zip(cum_weights, cum_weights[1:]))
+        assert EXCHANGE_WEIGHTS[0] <= cum_weights[0] <= EXCHANGE_WEIGHTS[2 * EXCHANGE_RANGE]
+
+def test_cached_exchange_policy_samples_as_without_the_cache(random_position):
+    EXCHANGE_CACHE.clear()
+    for position in _random_positions(random_position, 2, 10):
+        moves, cum_weights = exchange_moves(position)
+        expected = random.Random(5).choices(moves, cum_weights=cum_weights, k=3)
+        for _ in range(2):
+            rng = random.Random(5)
+            assert [exchange_policy(position, rng) for _ in range(3)] == expected
+    assert EXCHANGE_CACHE.misses == 10
+    assert EXCHANGE_CACHE.hits == 50
+
+def test_cache_stays_within_its_memory_limit(random_position):
+    cache = RolloutCache()
+    cache.limit_memory(0.1)
+    assert cache.max_bytes == int(CACHE_MEMORY_SHARE * 0.1 * (1 << 20))
+    for position in _random_positions(random_position, 3, 40):
+        cache.put((position.key(), position.color, False), exchange_moves(position))
+        assert cache.nbytes <= cache.max_bytes
+    assert 0 < len(cache.entries) < 40
+    assert cache.nbytes == sum(cache.entry_bytes(key, entry) for key, entry in cache.entries.items())
+    cache.limit_memory(0)
+    assert not cache.entries and cache.nbytes == 0
+
+def test_policies_play_only_legal_moves(random_position):
+    rng = random.Random(4)
+    for position in _random_positions(random_position, 4, 30):
+        legal = set(position.legal_moves())
+        for policy in (uniform_policy, capture_policy, exchange_policy):
+            for _ in range(10):
+                assert policy(position, rng) in legal
+
+def test_capture_and_exchange_favour_captures():
+    # RED's stack can spread onto BLUE's stack of 3; every other move takes nothing
+    position = _position({(3, 3): ('r', 1), (3, 4): ('b', 3)}, 6)
+    capture = spread_id(cell_index(3, 3), 0)
+    rng = random.Random(6)
+    samples = 400
+    uniform_share = sum(uniform_policy(position, rng) == capture for _ in range(samples)) / samples
+    capture_share = sum(capture_policy(position, rng) == capture for _ in range(samples)) / samples
+    exchange_share = sum(exchange_policy(position, rng) == capture for _ in range(samples)) / samples
+    assert uniform_share < 0.1
+    assert capture_share > 1 - 2 * EPSILON
+    assert exchange_share > 0.9
@@ -0,0 +1,94 @@
+import math
+import time
+
+from referee.game import PlayerColor
+from library.search import RootParallelPool
+from minmaxAgentPrunedUpdatedSpawn.program import Agent
+
+class _StubAgent:
+    """
+    Stands in for a minimax agent: a child is (value, steps), searched by
+    asking for moves steps times, which is where cancellation is noticed
+    """
+    def get_possible_moves(self, *args):
+        return []
+
+    def minimax(self, child, depth, isMaximizingPlayer, alpha, beta):
+        value, steps = child
+        for _ in range(steps):
+            self.get_possible_moves()
+            time.sleep(0.01)
+        return value, None
+
+def test_finite_beta_cancels_pending_root_moves():
+    pool = RootParallelPool(1)
+    futures = []
+    submit = pool._submit
+    def recording_submit(*args):
+        future = submit(*args)
+        futures.append(future)
+        return future
+    pool._submit = recording_submit
+    try:
+        children = [("first", (10, 0))] + [(f"slow{i}", (20, 300)) for i in range(12)]
+        start = time.monotonic()
+        value, move = pool.search(_StubAgent(), children, 1, -math.inf, 5)
+        assert (value, move) == (10, "first")
+        assert time.monotonic() - start < 3
+        # Only the moves already handed to the worker can escape cancelling
+        assert sum(future.cancelled() for future in futures) >= 8
+    finally:
+        pool.close()
+
+def test_infinite_window_searches_every_move():
+    pool = RootParallelPool(2)
+    try:
+        children = [(i, (value, 0)) for i, value in enumerate((3, 7, 5))]
+        assert pool.search(_StubAgent(), children, 1) == (7, 1)
+    finally:
+        pool.close()
+
+class _RecordingPool:
+    """
+    Answers root searches from a list of replies, keeping every window asked
+    """
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.windows = []
+
+    def search(self, agent, children, depth, alpha=-math.inf, beta=math.inf):
+        self.windows.append((alpha, beta))
+        return self.replies.pop(0)
+
+def _parallel_agent(pool, last_value):
+    agent = Agent(PlayerColor.RED)
+    agent._board = {(3, 3): (PlayerColor.RED, 2), (3, 5): (PlayerColor.BLUE, 1)}
+    agent._turn = 20
+    agent._search_pool = pool
+    agent._last_value = last_value
+    return agent
+
+def test_fail_high_searches_again_above_the_bound():
+    pool = _RecordingPool([(4, "good"), (9, "best")])
+    agent = _parallel_agent(pool, 0)
+    assert agent.parallel_minimax(agent._board, 2) == (9, "best")
+    assert pool.windows == [(-2, 2), (4, math.inf)]
+    assert agent._last_value == 9
+
+def test_fail_high_keeps_its_move_when_nothing_beats_it():
+    pool = _RecordingPool([(4, "good"), (4, None)])
+    agent = _parallel_agent(pool, 0)
+    assert agent.parallel_minimax(agent._board, 2) == (4, "good")
+
+def test_parallel_and_serial_values_agree_after_a_fail_high():
+    pool = RootParallelPool(2)
+    try:
+        agent = _parallel_agent(pool, None)
+        serial, _ = agent.minimax(agent._board, 2, True, -math.inf, math.inf)
+        # A last value far below the true one makes the window fail high
+        agent._last_value = serial - 10
+        value, move = agent.parallel_minimax(agent._board, 2)
+        assert value == serial
+        assert move is not None
+    finally:
+        pool.close()
@@ -0,0 +1,63 @@
+import mmap
+
+import numpy as np
+from referee.game import PlayerColor
+from mcts3.board import Board
+from mcts3.board.mcts import NODE_COLUMNS, NO_NODE, NodePool
+from mcts3.board.snapshot import build_snapshot, read_snapshot, write_snapshot
+from mcts3.library.geometry import NUM_CELLS, spawn_id
+
+def test_snapshot_round_trip(tmp_path):
+    board = Board({(3, 3): ('r', 2), (1, 1): ('b', 1)}, preload=False)
+    Board.tree.reset_empty()
+    for _ in range(200):
+        board.train_MCTS(PlayerColor.RED, 4)
+    path = str(tmp_path / "pool.tree")
+    write_snapshot(Board.tree, path)
+
+    pool = NodePool()
+    read_snapshot(pool, path)
+    assert pool.size == Board.tree.size
+    assert pool.root == Board.tree.root
+    for column, _ in NODE_COLUMNS:
+        size = pool.size
+        assert np.array_equal(getattr(pool, column)[:size], getattr(Board.tree, column)[:size])
+
+def _mapped(column: np.ndarray) -> bool:
+    base = column
+    while isinstance(base, np.ndarray):
+        base = base.base
+    if isinstance(base, memoryview):
+        base = base.obj
+    return isinstance(base, mmap.mmap)
+
+def test_new_nodes_go_into_the_mapped_spare_rows(tmp_path):
+    board = Board({(3, 3): ('r', 2), (1, 1): ('b', 1)}, preload=False)
+    Board.tree.reset_empty()
+    for _ in range(50):
+        board.train_MCTS(PlayerColor.RED, 4)
+    path = str(tmp_path / "pool.tree")
+    write_snapshot(Board.tree, path, spare=100)
+
+    read_snapshot(Board.tree, path)
+    pool = Board.tree
+    size = pool.size
+    for _ in range(50):
+        board.train_MCTS(PlayerColor.RED, 4)
+    assert pool.size > size
+    for column, _ in NODE_COLUMNS:
+        assert _mapped(getattr(pool, column)), column
+
+def test_snapshot_covers_blue_replies(tmp_path):
+    path = str(tmp_path / "opening.tree")
+    build_snapshot(iterations=20, reply_iterations=5, path=path)
+    pool = NodePool()
+    read_snapshot(pool, path)
+    root = pool.root
+    assert pool.visits[root] == 20
+    for cell in range(NUM_CELLS):
+        child = pool.child_with_move(root, spawn_id(cell))
+        assert child != NO_NODE
+        assert pool.parent[child] == root
+        assert pool.visits[child] >= 5
+        assert pool.num_children[child] > 0
@@ -0,0 +1,50 @@
+import pytest
+from mcts3 import time_manager
+from mcts3.time_manager import EXPECTED_GAME_TURNS, MIN_MOVES_LEFT, RESERVE, TimeManager
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(time_manager, "process_time", fake)
+    return fake
+
+def test_budget_splits_the_time_over_the_agents_remaining_moves(clock):
+    manager = TimeManager()
+    manager.start(100, 0)
+    assert manager.budget == pytest.approx(100 * (1 - RESERVE) / (EXPECTED_GAME_TURNS // 2))
+    manager.start(100, 40)
+    assert manager.budget == pytest.approx(100 * (1 - RESERVE) / ((EXPECTED_GAME_TURNS - 40) // 2))
+    # Past the expected length every move still plans for MIN_MOVES_LEFT more
+    for turn in (EXPECTED_GAME_TURNS - 2 * MIN_MOVES_LEFT, EXPECTED_GAME_TURNS, 300):
+        manager.start(100, turn)
+        assert manager.budget == pytest.approx(100 * (1 - RESERVE) / MIN_MOVES_LEFT)
+
+def test_stops_once_the_budget_is_spent(clock):
+    manager = TimeManager()
+    manager.start(80, 0)
+    clock.now = manager.budget / 2
+    assert not manager.should_stop(64, 0)
+    clock.now = manager.budget
+    assert manager.should_stop(64, 0)
+
+def test_stops_early_when_the_visit_gap_cannot_be_closed(clock):
+    manager = TimeManager()
+    manager.start(80, 0)
+    # 100 iterations in a quarter of the budget leaves room for about 300 more
+    clock.now = manager.budget / 4
+    assert not manager.should_stop(100, 250)
+    clock.now = 0.0
+    manager.start(80, 0)
+    clock.now = manager.budget / 4
+    assert manager.should_stop(100, 350)
+    # With no CPU time measured yet the rate is unknown, so it carries on
+    clock.now = 0.0
+    manager.start(80, 0)
+    assert not manager.should_stop(100, 10 ** 6)
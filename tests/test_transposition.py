@@ -0,0 +1,66 @@
+import random
+
+from referee.game import HexDir, PlayerColor, SpawnAction, SpreadAction
+from referee.game.hex import HexPos
+from library.geometry import NUM_CELLS, NUM_MOVES, decode_move, encode_move, \
+    is_spawn, move_cell, move_direction
+from library.search import EXACT, LOWER, UPPER, SIDE_TO_MOVE, ZOBRIST, TranspositionTable, board_hash
+from library.search.transposition import ENTRY_BYTES, _pack, _unpack
+
+def test_move_ids_round_trip():
+    for move in range(NUM_MOVES):
+        action = decode_move(move)
+        assert encode_move(action) == move
+        if is_spawn(move):
+            assert isinstance(action, SpawnAction)
+        else:
+            assert isinstance(action, SpreadAction)
+            assert action.direction == list(HexDir)[move_direction(move)]
+        assert (action.cell.r * 7 + action.cell.q) == move_cell(move)
+    assert encode_move(SpreadAction(HexPos(6, 6), list(HexDir)[-1])) == NUM_MOVES - 1
+
+def test_zobrist_keys_are_distinct():
+    keys = [key for cell in ZOBRIST for key in cell] + [SIDE_TO_MOVE]
+    assert len(set(keys)) == len(keys)
+
+def test_board_hash_is_the_xor_of_its_stacks():
+    rng = random.Random(0)
+    for _ in range(50):
+        cells = rng.sample(range(NUM_CELLS), rng.randint(1, 12))
+        board = {divmod(cell, 7): (rng.choice('rb'), rng.randint(1, 6)) for cell in cells}
+        colours = {cell: (PlayerColor.RED if c == 'r' else PlayerColor.BLUE, v)
+                   for cell, (c, v) in board.items()}
+        assert board_hash(board) == board_hash(colours)
+        # Removing a stack XORs its key back out
+        cell = rng.choice(list(board))
+        c, v = board.pop(cell)
+        removed = ZOBRIST[cell[0] * 7 + cell[1]][6 + (v if c == 'r' else -v)]
+        assert board_hash(board) == board_hash(colours) ^ removed
+
+def test_entries_pack_losslessly():
+    for value in (0.0, -3.0, 17.5, float('inf'), -float('inf')):
+        for depth in (0, 1, 255):
+            for flag in (EXACT, LOWER, UPPER):
+                for move in (None, 0, NUM_MOVES - 1):
+                    assert tuple(_unpack(_pack(value, depth, flag, move))) == (value, depth, flag, move)
+
+def test_table_keeps_deeper_results_and_ignores_torn_entries():
+    entries = 1 << 4
+    table = TranspositionTable(bytearray(entries * ENTRY_BYTES), entries)
+    key = 0x1234_5678_9ABC_DEF0
+    assert table.probe(key) is None
+    table.store(key, 2.0, 3, EXACT, 10)
+    table.store(key, 5.0, 1, LOWER, 11)
+    assert tuple(table.probe(key)) == (2.0, 3, EXACT, 10)
+    table.store(key, 7.0, 4, UPPER, None)
+    assert tuple(table.probe(key)) == (7.0, 4, UPPER, None)
+    # Another key in the same slot misses, then replaces the entry
+    other = key + entries
+    assert table.probe(other) is None
+    table.store(other, 1.0, 0, EXACT, 1)
+    assert table.probe(key) is None and table.probe(other) is not None
+    # Half of a concurrent write leaves an entry that no longer checks out
+    table._words[other & (entries - 1), 1] ^= 1 << 45
+    assert table.probe(other) is None
+    table.clear()
+    assert table.probe(other) is None
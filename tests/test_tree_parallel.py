@@ -0,0 +1,58 @@
+from referee.game import PlayerColor
+from mcts3.board.mcts import NO_NODE, WIDENING_ALPHA, WIDENING_K
+from mcts3.board.tree_parallel import TreeParallelMcts, _iterate
+from mcts3.library.geometry import decode_move
+from mcts3.library.position import Position
+
+BOARD = {(3, 3): ('r', 2), (1, 1): ('b', 1), (5, 2): ('b', 2)}
+
+def _check_tree(tree, iterations=None):
+    """
+    Every iteration ends at one node after visiting each node on its way
+    down, so a node's visits are its children's plus the iterations ending
+    there; and no virtual loss is left over
+    """
+    size = int(tree.header[0])
+    ends = 0
+    for node in range(size):
+        children = tree.children(node)
+        below = int(tree.visits[children].sum()) if children else 0
+        assert tree.visits[node] >= below
+        ends += int(tree.visits[node]) - below
+        for child in children:
+            assert tree.parent[child] == node
+        assert len(children) == tree.moves_taken[node]
+        assert len(children) <= max(1, int(WIDENING_K * float(tree.visits[node]) ** WIDENING_ALPHA))
+    assert (tree.virtual[:size] == 0).all()
+    assert (tree.wins[:size] <= tree.visits[:size]).all()
+    assert ends == tree.visits[0]
+    if iterations is not None:
+        assert tree.visits[0] == iterations
+
+def test_iterations_keep_visits_consistent():
+    pool = TreeParallelMcts(1, capacity=1 << 12)
+    try:
+        tree = pool.tree
+        tree.reset(PlayerColor.RED)
+        root = Position()
+        root.load(BOARD, PlayerColor.RED, 4)
+        position = Position()
+        for _ in range(300):
+            position.copy_from(root)
+            _iterate(tree, position)
+        _check_tree(tree, 300)
+        assert tree.first_child[0] != NO_NODE
+    finally:
+        pool.close()
+
+def test_parallel_search_leaves_no_virtual_loss():
+    pool = TreeParallelMcts(2, capacity=1 << 14)
+    try:
+        action = pool.search(BOARD, PlayerColor.RED, 4, 0.4)
+        position = Position()
+        position.load(BOARD, PlayerColor.RED, 4)
+        assert action in [decode_move(move) for move in position.legal_moves()]
+        assert pool.tree.visits[0] > 0
+        _check_tree(pool.tree)
+    finally:
+        pool.close()